@@ -0,0 +1,248 @@
+"""
+Benchmark suite for the NameGlow hot paths
+
+    python nameglow-benchmark.py --output bench-before.json
+    ... change something ...
+    python nameglow-benchmark.py --output bench-after.json --compare bench-before.json
+
+Each case is timed over many calls and reported as latency percentiles
+(microseconds) plus the peak traced memory of one extra call. Results are
+written as JSON keyed by case name, so two runs (e.g. two commits) can be
+compared; --compare exits non-zero when any case's median slowed down by
+more than --threshold.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from nameglow import NameGlow
+
+# Realistic names for each length from 3 to 15 letters
+NAMES_BY_LENGTH = {
+    3: "Amy", 4: "Emma", 5: "Grace", 6: "Robert", 7: "Michael", 8: "Jennifer",
+    9: "Alexander", 10: "Maximilian", 11: "Bartholomew", 12: "Christabelle",
+    13: "Sophia Johnson", 14: "Michael Brennan", 15: "Jennifer Lawless",
+}
+# Repeated-letter patterns stress the duplicate-skipping in permutation search
+REPEAT_PATTERNS = {
+    "aaaaaaaa": "Aaaaaaaa", "abababab": "Abababab", "aabbccdd": "Aabbccdd",
+    "annabella": "Annabella", "mississippi": "Mississippi",
+}
+
+
+def measure(func: Callable[[], object], repeat: int, warmup: int = 3) -> Dict:
+    """
+    Time ``repeat`` calls of ``func``, then trace one more call for peak memory
+
+    Cases slower than 10 ms a call get a tenth of the calls (at least 10),
+    so long searches don't dominate the run time.
+    """
+    start = time.perf_counter()
+    for _ in range(warmup):
+        func()
+    if (time.perf_counter() - start) / max(warmup, 1) > 0.01:
+        repeat = max(10, repeat // 10)
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1e6)
+    timings.sort()
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    def pct(q: float) -> float:
+        return timings[min(len(timings) - 1, int(round(q / 100 * (len(timings) - 1))))]
+
+    return {
+        "calls": repeat,
+        "mean_us": statistics.fmean(timings),
+        "p50_us": pct(50),
+        "p95_us": pct(95),
+        "p99_us": pct(99),
+        "max_us": timings[-1],
+        "peak_kib": peak / 1024,
+    }
+
+
+def anagram_cases(word_index_path: Optional[str] = None) -> Dict[str, Callable]:
+    # cache_size=0 disables the signature caches, so every call searches
+    cold = NameGlow(cache_size=0, llm_cache_path=None, word_index_path=word_index_path)
+    warm = NameGlow(llm_cache_path=None)
+    cases = {}
+    named = [(f"len{length:02d}", name) for length, name in NAMES_BY_LENGTH.items()]
+    named += [(f"repeat_{label}", name) for label, name in REPEAT_PATTERNS.items()]
+    for label, name in named:
+        cases[f"anagrams.jumble.{label}"] = lambda n=name: cold.generate_anagrams(n, real_words=False)
+        cases[f"anagrams.pronounceable.{label}"] = \
+            lambda n=name: cold.generate_anagrams(n, real_words=False, pronounceable=True, time_budget_ms=200)
+        if word_index_path:
+            cases[f"anagrams.words.{label}"] = \
+                lambda n=name: cold.generate_anagrams(n, real_words=True, time_budget_ms=200)
+    cases["anagrams.cached.len07"] = lambda: warm.generate_anagrams("Michael")
+    return cases
+
+
+def content_cases() -> Dict[str, Callable]:
+    cold = NameGlow(cache_size=0, llm_cache_path=None)
+    rng = random.Random(0)
+    names = list(NAMES_BY_LENGTH.values())
+    cycle = iter(range(sys.maxsize))
+
+    def next_name() -> str:
+        return names[next(cycle) % len(names)]
+
+    return {
+        "nicknames.count3": lambda: cold.generate_nicknames(next_name(), count=3, rng=rng),
+        "nicknames.count10": lambda: cold.generate_nicknames(next_name(), count=10, rng=rng),
+        "virtue.rule_based": lambda: cold.associate_virtue_with_anagram("leachim", next_name()),
+        "daily_content.cold": lambda: cold.generate_daily_content(next_name(), rng=rng),
+    }
+
+
+def history_cases(repeat: int, sizes: List[int]) -> Dict[str, Dict]:
+    """Append and read latency for one user as the shared history grows"""
+    results = {}
+    directory = tempfile.mkdtemp(prefix="nameglow-bench-")
+    try:
+        nameglow = NameGlow(llm_cache_path=None, history_path=os.path.join(directory, "history"))
+        content = nameglow.generate_daily_content("Michael", date="2026-01-01", rng=random.Random(0))
+        existing = 0
+        for size in sizes:
+            # Grow the store to ``size`` entries spread over many users
+            store = nameglow.get_history_store()
+            for i in range(existing, size):
+                store.append(f"user_{i % 1000}", content)
+            existing = size
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                results[f"history.save.size{size}"] = measure(
+                    lambda: nameglow.save_user_content("bench_user", content), repeat)
+            existing += repeat + 4
+            results[f"history.load.size{size}"] = measure(
+                lambda: nameglow.load_user_history("user_1"), max(repeat // 10, 5))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+def run_benchmarks(repeat: int = 200, word_index_path: Optional[str] = None,
+                   history_sizes: Optional[List[int]] = None, only: Optional[str] = None) -> Dict:
+    """
+    Run every benchmark case
+
+    Parameters:
+    -----------
+    repeat : int
+        Timed calls per case
+    word_index_path : str
+        Index from build_word_index; adds real-word anagram cases
+    history_sizes : List[int]
+        History store sizes (entries) to time saving and loading at
+    only : str
+        Run only cases whose name contains this substring
+
+    Returns:
+    --------
+    Dict
+        Run metadata and per-case results
+    """
+    history_sizes = history_sizes or [0, 1000, 10000]
+    cases = {**anagram_cases(word_index_path), **content_cases()}
+    results = {}
+    for name, func in cases.items():
+        if only and only not in name:
+            continue
+        results[name] = measure(func, repeat)
+        print(f"{name:45s} p50 {results[name]['p50_us']:10.1f} us  p95 {results[name]['p95_us']:10.1f} us  "
+              f"peak {results[name]['peak_kib']:8.1f} KiB", flush=True)
+
+    if not only or "history" in only:
+        for name, result in history_cases(repeat, history_sizes).items():
+            results[name] = result
+            print(f"{name:45s} p50 {result['p50_us']:10.1f} us  p95 {result['p95_us']:10.1f} us  "
+                  f"peak {result['peak_kib']:8.1f} KiB", flush=True)
+
+    return {"meta": run_metadata(repeat), "results": results}
+
+
+def run_metadata(repeat: int) -> Dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "commit": commit or None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "repeat": repeat,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = 1.2) -> List[str]:
+    """
+    Print the median ratio per case and return the cases that regressed
+
+    A case regresses when its p50 is more than ``threshold`` times the
+    baseline's. Cases present in only one run are listed but not judged.
+    """
+    regressions = []
+    print(f"\nComparing against {baseline['meta'].get('commit')} ({baseline['meta'].get('timestamp')})")
+    for name in sorted(set(baseline["results"]) | set(current["results"])):
+        before, after = baseline["results"].get(name), current["results"].get(name)
+        if before is None or after is None:
+            print(f"{name:45s} {'only in current' if before is None else 'only in baseline'}")
+            continue
+        ratio = after["p50_us"] / before["p50_us"] if before["p50_us"] else float("inf")
+        flag = ""
+        if ratio > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 / threshold:
+            flag = "  faster"
+        print(f"{name:45s} p50 {before['p50_us']:10.1f} -> {after['p50_us']:10.1f} us  x{ratio:5.2f}{flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark NameGlow hot paths")
+    parser.add_argument("--repeat", type=int, default=200, help="timed calls per case")
+    parser.add_argument("--output", default=None, help="write results to this JSON file")
+    parser.add_argument("--compare", default=None, help="baseline JSON from an earlier run")
+    parser.add_argument("--threshold", type=float, default=1.2, help="p50 slowdown ratio counted as a regression")
+    parser.add_argument("--word-index", default=None, help="index from build_word_index for real-word cases")
+    parser.add_argument("--history-sizes", default="0,1000,10000", help="comma-separated history sizes")
+    parser.add_argument("--only", default=None, help="run only cases whose name contains this")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.repeat, args.word_index,
+                            [int(size) for size in args.history_sizes.split(",")], args.only)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            regressed = compare(json.load(f), report, args.threshold)
+        if regressed:
+            print(f"\n{len(regressed)} case(s) regressed: {', '.join(regressed)}")
+            sys.exit(1)
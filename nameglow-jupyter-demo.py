@@ -1,5 +1,7 @@
-# Copy the NameGlow class code from the previous cell (or import it if saved as a module)
-# Then run this code to test the functionality
+# Run this from the repository root (or with it on sys.path) so the nameglow package imports
+import json
+
+from nameglow import NameGlow
 
 # Initialize the NameGlow system (without external API)
 nameglow = NameGlow(use_api=False)
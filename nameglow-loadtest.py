@@ -0,0 +1,142 @@
+"""
+Load test for the NameGlow daily content service
+
+Start the service, then point this at it:
+
+    python -m nameglow.service --port 8080
+    python nameglow-loadtest.py --url http://127.0.0.1:8080 --requests 5000 --concurrency 100
+
+Requests are spread over a pool of distinct user names, so the run mixes
+first-time computations, coalesced duplicates and cache hits. Reports
+throughput, latency percentiles and the service's own counters.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from typing import Dict, List
+
+import aiohttp
+
+FIRST_NAMES = ["Michael", "Sophia", "Robert", "Emma", "William", "Jennifer", "Olivia", "James",
+               "Amelia", "Benjamin", "Charlotte", "Lucas", "Isabella", "Henry", "Mia", "Alexander"]
+
+
+def make_names(count: int, seed: int = 0) -> List[str]:
+    """Distinct, realistic-looking user names"""
+    rng = random.Random(seed)
+    return [f"{rng.choice(FIRST_NAMES)} {i:05d}" if i >= len(FIRST_NAMES) else FIRST_NAMES[i]
+            for i in range(count)]
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run_load_test(url: str, names: List[str], requests: int, concurrency: int,
+                        batch_size: int = 0, date: str = None, seed: int = 0) -> Dict:
+    """
+    Fire ``requests`` requests with at most ``concurrency`` in flight
+
+    Parameters:
+    -----------
+    url : str
+        Service root, e.g. http://127.0.0.1:8080
+    names : List[str]
+        Pool of user names to draw requests from
+    requests : int
+        Total number of HTTP requests
+    concurrency : int
+        Maximum requests in flight at once
+    batch_size : int
+        Names per POST /batch request; 0 sends GET /daily requests
+    date : str
+        Date to request (YYYY-MM-DD); the service's today by default
+    seed : int
+        Seed for the order names are drawn in
+
+    Returns:
+    --------
+    Dict
+        Request counts, throughput, latency percentiles and service stats
+    """
+    rng = random.Random(seed)
+    url = url.rstrip("/")
+    latencies = []
+    errors = 0
+    queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait([rng.choice(names) for _ in range(max(batch_size, 1))])
+
+    async def worker(session: aiohttp.ClientSession):
+        nonlocal errors
+        while not queue.empty():
+            batch = queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                if batch_size:
+                    body = {"names": batch, **({"date": date} if date else {})}
+                    request = session.post(f"{url}/batch", json=body)
+                else:
+                    params = {"name": batch[0], **({"date": date} if date else {})}
+                    request = session.get(f"{url}/daily", params=params)
+                async with request as response:
+                    await response.read()
+                    if response.status != 200:
+                        errors += 1
+                        continue
+            except aiohttp.ClientError:
+                errors += 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        async with session.get(f"{url}/stats") as response:
+            service_stats = await response.json()
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "ok": len(latencies),
+        "errors": errors,
+        "seconds": elapsed,
+        "requests_per_second": requests / elapsed if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "mean": statistics.fmean(latencies) if latencies else 0.0,
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": latencies[-1] if latencies else 0.0,
+        },
+        "service": service_stats,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test a running NameGlow service")
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--requests", type=int, default=2000, help="total HTTP requests")
+    parser.add_argument("--concurrency", type=int, default=50, help="requests in flight at once")
+    parser.add_argument("--users", type=int, default=500, help="distinct user names to draw from")
+    parser.add_argument("--batch-size", type=int, default=0, help="names per POST /batch (0 = GET /daily)")
+    parser.add_argument("--date", default=None, help="date to request (YYYY-MM-DD)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    result = asyncio.run(run_load_test(args.url, make_names(args.users, args.seed), args.requests,
+                                       args.concurrency, args.batch_size, args.date, args.seed))
+    latency = result["latency_ms"]
+    print(f"{result['ok']}/{result['requests']} ok, {result['errors']} errors in {result['seconds']:.2f} s "
+          f"({result['requests_per_second']:.0f} req/s)")
+    print(f"latency ms: mean {latency['mean']:.1f}  p50 {latency['p50']:.1f}  p95 {latency['p95']:.1f}  "
+          f"p99 {latency['p99']:.1f}  max {latency['max']:.1f}")
+    print(json.dumps(result["service"], indent=2))
@@ -0,0 +1,125 @@
+"""
+Local stand-in for the OpenAI and Anthropic chat APIs
+
+Run it, then point NameGlow at it instead of the real provider:
+
+    python nameglow-stub-provider.py --port 8765
+
+    nameglow = NameGlow(use_api=True, api_type="openai", api_key="test",
+                        api_base_url="http://127.0.0.1:8765/v1")
+
+Replies are canned: a virtue word for virtue prompts and JSON arrays for
+nickname and batched virtue prompts, picked deterministically from the
+prompt text.
+
+Faults can be injected to exercise NameGlow's timeouts, retries, circuit
+breaker and hedged mode, either at startup or while running:
+
+    python nameglow-stub-provider.py --delay-ms 50 --jitter-ms 200 --fail-rate 0.2 --hang-rate 0.05
+
+    curl -X POST localhost:8765/control -d '{"fail_rate": 1.0}'   # take the provider down
+    curl -X POST localhost:8765/control -d '{"fail_rate": 0.0}'   # bring it back
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import zlib
+
+from aiohttp import web
+
+VIRTUES = ["Kindness", "Courage", "Wisdom", "Patience", "Honesty", "Compassion",
+           "Creativity", "Resilience", "Generosity", "Gratitude", "Humility", "Joy"]
+
+
+def pick_virtue(text: str) -> str:
+    return VIRTUES[zlib.crc32(text.encode("utf-8")) % len(VIRTUES)]
+
+
+def canned_reply(prompt: str) -> str:
+    """Answer a NameGlow prompt the way a cooperative model would"""
+    match = re.search(r"Anagrams \(JSON\): (.*)", prompt)
+    if match:
+        items = json.loads(match.group(1))
+        return json.dumps([{"id": item["id"], "virtue": pick_virtue(item["anagram"])} for item in items])
+    match = re.search(r"Generate (\d+) nicknames for someone named '([^']*)'", prompt)
+    if match:
+        count, name = int(match.group(1)), match.group(2)
+        return json.dumps([
+            {"nickname": f"{name[:3].capitalize()}{suffix}", "meaning": f"Stub nickname {i + 1} for {name}"}
+            for i, suffix in enumerate(["ie", "o", "bean", "star", "light"][:count])
+        ])
+    return pick_virtue(prompt)
+
+
+def make_app(delay_ms: float = 0.0, jitter_ms: float = 0.0, fail_rate: float = 0.0,
+             hang_rate: float = 0.0, seed: int = 0) -> web.Application:
+    """
+    Build the stub server
+
+    delay_ms adds latency to every reply, plus a uniform random extra of up
+    to jitter_ms. A fail_rate fraction of requests get a 503, and a
+    hang_rate fraction never answer (they sleep for an hour). All of these
+    can be changed at runtime with POST /control.
+    """
+    faults = {"delay_ms": delay_ms, "jitter_ms": jitter_ms, "fail_rate": fail_rate, "hang_rate": hang_rate}
+    stats = {"requests": 0, "failed": 0, "hung": 0}
+    rng = random.Random(seed)
+
+    async def reply(request: web.Request, prompt: str) -> str:
+        stats["requests"] += 1
+        roll = rng.random()
+        if roll < faults["hang_rate"]:
+            stats["hung"] += 1
+            await asyncio.sleep(3600)
+        delay = faults["delay_ms"] + rng.uniform(0, faults["jitter_ms"])
+        if delay:
+            await asyncio.sleep(delay / 1000)
+        if roll < faults["hang_rate"] + faults["fail_rate"]:
+            stats["failed"] += 1
+            raise web.HTTPServiceUnavailable(text="injected failure")
+        return canned_reply(prompt)
+
+    async def openai_chat(request: web.Request) -> web.Response:
+        body = await request.json()
+        text = await reply(request, body["messages"][-1]["content"])
+        return web.json_response({"choices": [{"message": {"role": "assistant", "content": text}}]})
+
+    async def anthropic_messages(request: web.Request) -> web.Response:
+        body = await request.json()
+        text = await reply(request, body["messages"][-1]["content"])
+        return web.json_response({"content": [{"type": "text", "text": text}]})
+
+    async def get_stats(request: web.Request) -> web.Response:
+        return web.json_response({**stats, **faults})
+
+    async def control(request: web.Request) -> web.Response:
+        changes = await request.json()
+        unknown = set(changes) - set(faults)
+        if unknown:
+            raise web.HTTPBadRequest(text=f"Unknown settings: {sorted(unknown)}")
+        faults.update({key: float(value) for key, value in changes.items()})
+        return web.json_response(faults)
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", openai_chat)
+    app.router.add_post("/v1/messages", anthropic_messages)
+    app.router.add_get("/stats", get_stats)
+    app.router.add_post("/control", control)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stub LLM provider for NameGlow")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="latency added to every reply")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="random extra latency, up to this much")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="fraction of requests that never answer")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the injected faults")
+    args = parser.parse_args()
+
+    web.run_app(make_app(args.delay_ms, args.jitter_ms, args.fail_rate, args.hang_rate, args.seed),
+                host=args.host, port=args.port)
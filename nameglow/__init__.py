@@ -0,0 +1,49 @@
+"""
+NameGlow: daily anagrams, virtues, nicknames and reflections from a name
+
+Importing the package only loads the standard library. Optional extras are
+imported the first time they are used:
+
+- numpy: dictionary anagrams (WordIndex), pronounceable ranking and
+  history analytics (analyze_history)
+- pandas, matplotlib: HistoryStats.to_frames and HistoryStats.plot
+- aiohttp: API-backed virtues and nicknames (nameglow.providers) and the
+  HTTP service (nameglow.service)
+- IPython: NameGlow.display_content in notebooks
+"""
+from .analytics import HistoryStats, analyze_history
+from .anagrams import (AnagramResults, SearchBudget, distinct_permutations, letter_signature,
+                       one_letter_variants)
+from .cache import LLMCache, SignatureCache
+from .core import NameGlow
+from .history import HistoryStore
+from .metrics import MetricsRegistry
+from .pronounce import pronounceable_anagrams, train_bigram_model
+from .records import DailyRecord, RecordCodec
+from .render import CardRenderer, render_card
+from .schedule import ContentSchedule
+from .wordindex import DEFAULT_WORD_INDEX, DEFAULT_WORDLIST, WordIndex, build_word_index
+
+# Provider classes pull in asyncio, so they load on first attribute access
+_PROVIDER_NAMES = {"LLMProvider", "OpenAIProvider", "AnthropicProvider", "PROVIDERS", "make_provider"}
+
+__all__ = [
+    "NameGlow",
+    "AnagramResults", "SearchBudget", "distinct_permutations", "letter_signature", "one_letter_variants",
+    "LLMCache", "SignatureCache",
+    "HistoryStore", "HistoryStats", "analyze_history",
+    "MetricsRegistry",
+    "pronounceable_anagrams", "train_bigram_model",
+    "DailyRecord", "RecordCodec",
+    "CardRenderer", "render_card",
+    "ContentSchedule",
+    "DEFAULT_WORD_INDEX", "DEFAULT_WORDLIST", "WordIndex", "build_word_index",
+    *sorted(_PROVIDER_NAMES),
+]
+
+
+def __getattr__(name):
+    if name in _PROVIDER_NAMES:
+        from . import providers
+        return getattr(providers, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
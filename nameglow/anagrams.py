@@ -0,0 +1,145 @@
+"""Letter-jumble anagram enumeration and search budgets"""
+import random
+import time
+from typing import List, Dict, Optional, Iterator, Sequence
+
+
+def distinct_permutations(letters: Sequence[str]) -> Iterator[str]:
+    """
+    Lazily yield each distinct ordering of a letter multiset exactly once
+    
+    Orderings come out in the same sequence as the first occurrences in
+    ``itertools.permutations(letters)``, but repeated letters never produce
+    duplicate branches, so the work per result stays bounded by the name
+    length no matter how many letters repeat.
+    
+    Parameters:
+    -----------
+    letters : Sequence[str]
+        The letters to arrange (a string or list of single characters)
+        
+    Returns:
+    --------
+    Iterator[str]
+        Generator of distinct permutation strings
+    """
+    n = len(letters)
+    if n == 0:
+        yield ''
+        return
+    
+    # Positions of each distinct letter, in first-appearance order
+    positions: Dict[str, List[int]] = {}
+    for idx, letter in enumerate(letters):
+        positions.setdefault(letter, []).append(idx)
+    used = {letter: 0 for letter in positions}
+    
+    def candidates() -> Iterator[str]:
+        # itertools.permutations walks index tuples lexicographically, so the
+        # first copy of each string always takes the lowest unused position of
+        # every letter; ordering choices by that position reproduces its order
+        available = [l for l in positions if used[l] < len(positions[l])]
+        available.sort(key=lambda l: positions[l][used[l]])
+        return iter(available)
+    
+    prefix: List[str] = []
+    stack = [candidates()]
+    while stack:
+        letter = next(stack[-1], None)
+        if letter is None:
+            stack.pop()
+            if prefix:
+                used[prefix.pop()] -= 1
+            continue
+        
+        used[letter] += 1
+        prefix.append(letter)
+        if len(prefix) == n:
+            yield ''.join(prefix)
+            used[prefix.pop()] -= 1
+        else:
+            stack.append(candidates())
+
+def one_letter_variants(letters: Sequence[str]) -> Iterator[str]:
+    """
+    Lazily yield distinct anagrams with one letter added or removed
+    
+    Each variant is a new letter multiset derived from the multiset of
+    ``letters``: one per letter of the alphabet for additions, and one per
+    distinct letter for removals (dropping either 'm' from "emma" gives the
+    same multiset, so it is only enumerated once). Multisets never overlap,
+    so every string is produced at most once.
+    
+    Parameters:
+    -----------
+    letters : Sequence[str]
+        The original letters, in name order
+        
+    Returns:
+    --------
+    Iterator[str]
+        Generator of variant anagram strings
+    """
+    letters = list(letters)
+    
+    # Try adding one letter
+    for letter in 'abcdefghijklmnopqrstuvwxyz':
+        yield from distinct_permutations(letters + [letter])
+    
+    # Try removing one letter if name is long enough
+    if len(letters) > 3:
+        removed = set()
+        for i, letter in enumerate(letters):
+            if letter in removed:
+                continue
+            removed.add(letter)
+            yield from distinct_permutations(letters[:i] + letters[i + 1:])
+
+
+def letter_signature(letters: Sequence[str]) -> str:
+    """Return the sorted-letter signature shared by all anagrams of ``letters``"""
+    return ''.join(sorted(letters))
+
+
+def signature_arrangement(signature: str) -> str:
+    """
+    Fixed, shuffled arrangement of a signature's letters to search from
+    
+    Seeded by the signature itself (str seeds hash the same in every
+    process), so names with the same letters still share one cached search,
+    but jumbles don't start from the alphabetical order.
+    """
+    letters = list(signature)
+    random.Random(signature).shuffle(letters)
+    return ''.join(letters)
+
+
+class SearchBudget:
+    """
+    Work limit for one anagram search, in wall-clock time and/or steps
+    
+    Searches call tick() once per candidate or search node they examine and
+    stop as soon as it returns False, keeping whatever they found so far.
+    """
+    
+    def __init__(self, time_budget_ms: Optional[float] = None, max_steps: Optional[int] = None):
+        self.deadline = None if time_budget_ms is None else time.perf_counter() + time_budget_ms / 1000
+        self.max_steps = max_steps
+        self.steps = 0
+        self.exhausted = False
+    
+    def tick(self) -> bool:
+        """Count one step, returning False once the budget is used up"""
+        self.steps += 1
+        if (self.max_steps is not None and self.steps > self.max_steps) or \
+                (self.deadline is not None and time.perf_counter() >= self.deadline):
+            self.exhausted = True
+        return not self.exhausted
+
+
+class AnagramResults(list):
+    """A list of anagrams that also records whether the search was cut short"""
+    
+    def __init__(self, anagrams=(), truncated: bool = False):
+        super().__init__(anagrams)
+        self.truncated = truncated
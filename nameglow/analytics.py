@@ -0,0 +1,212 @@
+"""
+Streaming analytics over a HistoryStore (needs numpy; pandas and
+matplotlib for the optional frames and charts)
+
+The store is read one chunk of entries at a time and folded into running
+numpy aggregates, so memory grows with the number of users and distinct
+(user, anagram) pairs, not with the size of the history on disk.
+"""
+import hashlib
+from typing import Dict, List, Optional, Union, TYPE_CHECKING
+
+from .history import HistoryStore
+from .records import DailyRecord, RecordCodec
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+# Literal (e.g. API) nicknames are tallied under this code and label
+_LITERAL_CODE = 0xFF
+OTHER_NICKNAME = "other"
+# Deduplicate the (user, anagram) keys once this many are pending
+_COMPACT_KEYS = 1 << 20
+
+
+class HistoryStats:
+    """
+    Aggregates from one pass over a history store
+    
+    ``user_virtue_counts[u, v]`` counts entries of user ``users[u]`` with
+    virtue ``virtues[v]``; the other arrays are indexed by user the same way.
+    """
+    
+    def __init__(self, users: List[str], virtues: List[str], user_virtue_counts: "np.ndarray",
+                 entries: "np.ndarray", distinct_anagrams: "np.ndarray", nickname_counts: Dict[str, int]):
+        self.users = users
+        self.virtues = virtues
+        self.user_virtue_counts = user_virtue_counts
+        self.entries = entries
+        self.distinct_anagrams = distinct_anagrams
+        self.nickname_counts = nickname_counts
+        self._user_index = {user: i for i, user in enumerate(users)}
+    
+    @property
+    def total_entries(self) -> int:
+        return int(self.entries.sum())
+    
+    def virtue_distribution(self, user_id: Optional[str] = None) -> Dict[str, int]:
+        """Virtue counts, most common first, for one user or everyone"""
+        if user_id is None:
+            counts = self.user_virtue_counts.sum(axis=0)
+        else:
+            counts = self.user_virtue_counts[self._user_index[user_id]]
+        order = counts.argsort(kind="stable")[::-1]
+        return {self.virtues[i]: int(counts[i]) for i in order if counts[i]}
+    
+    def anagram_reuse_rate(self, user_id: Optional[str] = None) -> float:
+        """
+        Share of entries whose anagram the same user had already been shown
+        
+        0.0 means every entry brought a new anagram; computed over all users
+        when ``user_id`` is None. Anagrams are compared by 64-bit hash, so
+        two different ones would only count as a repeat on a hash collision.
+        """
+        if user_id is None:
+            entries, distinct = self.entries.sum(), self.distinct_anagrams.sum()
+        else:
+            i = self._user_index[user_id]
+            entries, distinct = self.entries[i], self.distinct_anagrams[i]
+        return float((entries - distinct) / entries) if entries else 0.0
+    
+    def nickname_pattern_frequencies(self) -> Dict[str, int]:
+        """Nickname counts per rule-based pattern ("kind:pattern"), most common first"""
+        return dict(sorted(self.nickname_counts.items(), key=lambda item: -item[1]))
+    
+    def to_frames(self) -> Dict[str, "pd.DataFrame"]:
+        """The aggregates as pandas DataFrames: per-user summary, user x virtue counts, nicknames"""
+        import pandas as pd
+        reuse = (self.entries - self.distinct_anagrams) / self.entries.clip(min=1)
+        users = pd.DataFrame({"entries": self.entries, "distinct_anagrams": self.distinct_anagrams,
+                              "anagram_reuse_rate": reuse}, index=pd.Index(self.users, name="user_id"))
+        virtues = pd.DataFrame(self.user_virtue_counts, index=users.index, columns=self.virtues)
+        nicknames = pd.Series(self.nickname_pattern_frequencies(), name="count").rename_axis("pattern").to_frame()
+        return {"users": users, "virtues": virtues, "nicknames": nicknames}
+    
+    def plot(self, path: Optional[str] = None, top: int = 15):
+        """
+        Bar charts of the global virtue and nickname distributions and a
+        histogram of per-user anagram reuse
+        
+        Parameters:
+        -----------
+        path : str
+            Save the figure here (e.g. summary.png) instead of only returning it
+        top : int
+            Bars shown per distribution
+        
+        Returns:
+        --------
+        matplotlib.figure.Figure
+            The summary figure
+        """
+        import matplotlib
+        if path is not None:
+            matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+        
+        fig, (virtue_ax, nickname_ax, reuse_ax) = plt.subplots(1, 3, figsize=(18, 5))
+        virtues = list(self.virtue_distribution().items())[:top]
+        virtue_ax.barh([v for v, _ in virtues][::-1], [c for _, c in virtues][::-1], color="#4a6fa5")
+        virtue_ax.set_title("Virtues")
+        
+        nicknames = list(self.nickname_pattern_frequencies().items())[:top]
+        nickname_ax.barh([n for n, _ in nicknames][::-1], [c for _, c in nicknames][::-1], color="#7f8c8d")
+        nickname_ax.set_title("Nickname patterns")
+        
+        reuse = (self.entries - self.distinct_anagrams) / self.entries.clip(min=1)
+        reuse_ax.hist(reuse, bins=20, range=(0, 1), color="#2c3e50")
+        reuse_ax.set_title(f"Anagram reuse per user (overall {self.anagram_reuse_rate():.1%})")
+        reuse_ax.set_xlabel("share of entries repeating an earlier anagram")
+        
+        fig.suptitle(f"NameGlow history: {self.total_entries} entries, {len(self.users)} users")
+        fig.tight_layout()
+        if path is not None:
+            fig.savefig(path)
+        return fig
+
+
+def analyze_history(store: Union[HistoryStore, str] = "nameglow_history", chunk_size: int = 65536,
+                    since: Optional[str] = None, codec: Optional[RecordCodec] = None) -> HistoryStats:
+    """
+    Compute virtue, anagram reuse and nickname statistics in one streaming pass
+
+    Parameters:
+    -----------
+    store : HistoryStore or str
+        The store, or the directory of an existing one (opened read-only)
+    chunk_size : int
+        Entries read and aggregated per step
+    since : str
+        Only count entries dated on or after this YYYY-MM-DD date
+    codec : RecordCodec
+        Tables for JSONL entries when the store has none saved; the
+        default NameGlow tables otherwise
+
+    Returns:
+    --------
+    HistoryStats
+        The aggregates
+    """
+    import numpy as np
+
+    if isinstance(store, str):
+        store = HistoryStore(store, readonly=True)
+    codec = store.codec or codec
+    if codec is None:
+        from .core import NameGlow
+        codec = NameGlow(llm_cache_path=None).record_codec()
+
+    users: Dict[str, int] = {}
+    virtues: Dict[str, int] = {v: i for i, v in enumerate(codec.virtues)}
+    user_virtue = np.zeros((1024, max(len(virtues), 1)), dtype=np.int64)
+    nickname_codes = np.zeros(256, dtype=np.int64)
+    pair_chunks: List["np.ndarray"] = []
+    pending = 0
+    pairs = np.empty((0, 2), dtype=np.uint64)
+
+    for chunk in store.scan(chunk_size, since=since):
+        user_idx = np.empty(len(chunk), dtype=np.int64)
+        virtue_idx = np.empty(len(chunk), dtype=np.int64)
+        anagram_hash = np.empty(len(chunk), dtype=np.uint64)
+        codes = []
+        for i, (user_id, entry) in enumerate(chunk):
+            record = entry if isinstance(entry, DailyRecord) else codec.encode(entry)
+            user_idx[i] = users.setdefault(user_id, len(users))
+            virtue = record.virtue
+            if isinstance(virtue, str) or virtue is None:
+                # API virtues outside the table get columns of their own
+                virtue = virtues.setdefault(virtue or "(none)", len(virtues))
+            virtue_idx[i] = virtue
+            anagram_hash[i] = int.from_bytes(
+                hashlib.blake2b((record.anagram or "").encode("utf-8"), digest_size=8).digest(), "little")
+            codes.extend(_LITERAL_CODE if isinstance(n, tuple) else n for n in record.nicknames)
+
+        rows, cols = max(len(users), 1), max(len(virtues), 1)
+        if rows > user_virtue.shape[0] or cols > user_virtue.shape[1]:
+            grown = np.zeros((max(rows, 2 * user_virtue.shape[0]), max(cols, user_virtue.shape[1])),
+                             dtype=np.int64)
+            grown[:user_virtue.shape[0], :user_virtue.shape[1]] = user_virtue
+            user_virtue = grown
+        np.add.at(user_virtue, (user_idx, virtue_idx), 1)
+        nickname_codes += np.bincount(np.asarray(codes, dtype=np.int64), minlength=256)
+
+        # (user index, anagram hash) rows, deduplicated in bulk
+        pair_chunks.append(np.column_stack((user_idx.astype(np.uint64), anagram_hash)))
+        pending += len(chunk)
+        if pending >= _COMPACT_KEYS:
+            pairs = np.unique(np.concatenate([pairs, *pair_chunks]), axis=0)
+            pair_chunks, pending = [], 0
+
+    pairs = np.unique(np.concatenate([pairs, *pair_chunks]), axis=0)
+    user_count = len(users)
+    user_virtue = user_virtue[:user_count, :len(virtues)]
+    distinct = np.bincount(pairs[:, 0].astype(np.int64), minlength=user_count)[:user_count]
+
+    nicknames = {}
+    for code in np.flatnonzero(nickname_codes):
+        label = OTHER_NICKNAME if code == _LITERAL_CODE else ":".join(codec.nickname_pattern(int(code)))
+        nicknames[label] = int(nickname_codes[code])
+
+    return HistoryStats(list(users), list(virtues), user_virtue, user_virtue.sum(axis=1),
+                        distinct, nicknames)
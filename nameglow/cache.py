@@ -0,0 +1,230 @@
+"""In-memory signature cache and persistent LLM response cache"""
+import contextlib
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, Optional
+
+
+class SignatureCache:
+    """
+    Bounded LRU mapping with hit/miss counters
+    
+    Keys include a sorted-letter signature, so names that are anagrams of
+    each other ("Amy", "May", "mya") share one entry. Safe to share
+    between threads.
+    """
+    
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        """Return the cached value, or None on a miss"""
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._data.move_to_end(key)
+            return value
+    
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entry if full"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+    
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class LLMCache:
+    """
+    Persistent SQLite cache of provider responses with a TTL and a size cap
+    
+    Entries are keyed by a hash of provider, model and normalized prompt.
+    The database runs in WAL mode and every write is a short IMMEDIATE
+    transaction, so several worker processes can share one file. When the
+    stored responses exceed max_bytes, expired entries are dropped first,
+    then the least recently used ones.
+    
+    Hits are read-only: their access times are queued and written in one
+    transaction once ``touch_batch`` are pending or the oldest is
+    ``touch_interval`` seconds old (and before any eviction), so lookups
+    don't take the database write lock.
+    """
+    
+    def __init__(self, path: str = "nameglow_llm_cache.sqlite3", ttl_seconds: float = 7 * 24 * 3600,
+                 max_bytes: int = 64 * 1024 * 1024, touch_batch: int = 64, touch_interval: float = 5.0):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.touch_batch = touch_batch
+        self.touch_interval = touch_interval
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._connections = []
+        self._touch_lock = threading.Lock()
+        self._touched: Dict[str, float] = {}
+        self._touched_since = 0.0
+        with self._transaction() as conn:
+            conn.execute("""CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY, provider TEXT, model TEXT, response TEXT,
+                size INTEGER, created REAL, accessed REAL)""")
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER)")
+            conn.execute("INSERT OR IGNORE INTO meta VALUES ('total_bytes', 0)")
+    
+    @staticmethod
+    def make_key(provider: str, model: str, system: str, prompt: str, max_tokens: int) -> str:
+        """Hash a request, ignoring differences in whitespace"""
+        normalize = lambda text: re.sub(r"\s+", " ", text).strip()
+        raw = json.dumps([provider, model, normalize(system), normalize(prompt), max_tokens])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections can't be shared between threads, so keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # check_same_thread=False only so close() can close every thread's connection
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._touch_lock:
+                self._connections.append(conn)
+        return conn
+    
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        # IMMEDIATE takes the write lock up front, so concurrent writers queue
+        # on busy_timeout instead of failing halfway through
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return a fresh cached response, or None"""
+        now = time.time()
+        row = self._connection().execute(
+            "SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None or now - row[1] > self.ttl_seconds:
+            self.misses += 1
+            return None
+        self.hits += 1
+        with self._touch_lock:
+            if not self._touched:
+                self._touched_since = now
+            self._touched[key] = now
+            due = len(self._touched) >= self.touch_batch or now - self._touched_since >= self.touch_interval
+        if due:
+            self.flush_access_times()
+        return row[0]
+    
+    def _take_touched(self) -> Dict[str, float]:
+        with self._touch_lock:
+            touched, self._touched = self._touched, {}
+        return touched
+    
+    @staticmethod
+    def _write_access_times(conn: sqlite3.Connection, touched: Dict[str, float]):
+        conn.executemany("UPDATE responses SET accessed = MAX(accessed, ?) WHERE key = ?",
+                         [(accessed, key) for key, accessed in touched.items()])
+    
+    def flush_access_times(self):
+        """Write queued access times now"""
+        touched = self._take_touched()
+        if touched:
+            with self._transaction() as conn:
+                self._write_access_times(conn, touched)
+    
+    def put(self, key: str, response: str, provider: str = "", model: str = ""):
+        """Store a response, evicting old entries if the cache is over its size cap"""
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._transaction() as conn:
+            old = conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         (key, provider, model, response, size, now, now))
+            conn.execute("UPDATE meta SET value = value + ? WHERE name = 'total_bytes'",
+                         (size - (old[0] if old else 0),))
+            # Eviction goes by access time, so queued hits must land first
+            self._write_access_times(conn, self._take_touched())
+            self._evict(conn, now)
+    
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        total = conn.execute("SELECT value FROM meta WHERE name = 'total_bytes'").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        freed = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses WHERE created < ?",
+                             (now - self.ttl_seconds,)).fetchone()[0]
+        conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,))
+        total -= freed
+        while total > self.max_bytes:
+            rows = conn.execute("SELECT key, size FROM responses ORDER BY accessed LIMIT 64").fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                total -= size
+                if total <= self.max_bytes:
+                    break
+        conn.execute("UPDATE meta SET value = ? WHERE name = 'total_bytes'", (max(total, 0),))
+    
+    def clear(self):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM responses")
+            conn.execute("UPDATE meta SET value = 0 WHERE name = 'total_bytes'")
+    
+    def stats(self) -> Dict:
+        entries, total = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+        }
+    
+    def close(self):
+        """Write queued access times and close every thread's connection"""
+        self.flush_access_times()
+        with self._touch_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
@@ -0,0 +1,1111 @@
+"""The NameGlow content generator"""
+import datetime
+import functools
+import hashlib
+import itertools
+import json
+import os
+import random
+import threading
+import time
+import weakref
+from array import array
+from collections import deque
+from typing import List, Dict, Tuple, Optional, Iterator, Iterable, Sequence, TYPE_CHECKING
+
+from .anagrams import (AnagramResults, SearchBudget, distinct_permutations, letter_signature,
+                       one_letter_variants, signature_arrangement)
+from .cache import LLMCache, SignatureCache
+from .history import HistoryStore
+from .metrics import _NOOP, MetricsRegistry
+from .pronounce import _SAMPLE_WORDS, pronounceable_anagrams, train_bigram_model
+from .records import RecordCodec, rule_nickname
+from .resilience import CircuitBreaker, ProviderUnavailable, RetryPolicy, is_retryable
+from .schedule import ContentSchedule, rotate_virtues
+from .wordindex import WordIndex
+
+if TYPE_CHECKING:
+    import numpy as np
+    from .providers import LLMProvider
+
+# If you have an API key for a language model (OpenAI, Anthropic, etc.)
+# pass it in, e.g. NameGlow(use_api=True, api_type="openai", api_key="...").
+# Requests go straight to the provider's HTTP API through aiohttp.
+
+
+class NameGlow:
+    def __init__(self, use_api=False, api_type=None, api_key=None, word_index_path=None,
+                 pronounceable=False, bigram_model_path=None, cache_size=4096,
+                 api_model=None, api_base_url=None, api_concurrency=8, api_timeout=30.0,
+                 llm_cache_path="nameglow_llm_cache.sqlite3", llm_cache_ttl=7 * 24 * 3600,
+                 llm_cache_max_bytes=64 * 1024 * 1024, history_path="nameglow_history",
+                 metrics: Optional[MetricsRegistry] = None, api_retries=2, api_backoff=0.2,
+                 breaker_threshold=5, breaker_reset=30.0, hedge_after_ms=None, compact_history=True,
+                 pronounceable_max_steps=20_000):
+        """
+        Initialize the NameGlow prototype
+        
+        Parameters:
+        -----------
+        use_api : bool
+            Whether to use an external API for generating content
+        api_type : str
+            Type of API to use ('openai' or 'anthropic')
+        api_key : str
+            API key for the selected service
+        word_index_path : str
+            Path to an index built by build_word_index; when set, anagrams
+            are real words and phrases instead of letter jumbles
+        pronounceable : bool
+            Rank letter-jumble anagrams by a letter bigram model by default
+        pronounceable_max_steps : int
+            Search nodes allowed for a pronounceable ranking when the caller
+            gives no budget, so long names can't stall a request (about
+            0.2 s; names up to ~12 letters finish well within it)
+        bigram_model_path : str
+            .npy table from train_bigram_model; a small built-in English
+            sample is used when not given
+        cache_size : int
+            Entries kept in each per-signature anagram and virtue cache
+        api_model : str
+            Model name; defaults to the provider's standard model
+        api_base_url : str
+            Provider endpoint root, e.g. a local stub server for testing
+        api_concurrency : int
+            Maximum API requests in flight at once, per event loop
+        api_timeout : float
+            Seconds allowed for one API request, counted once it has a
+            connection slot (see api_concurrency)
+        llm_cache_path : str
+            SQLite file caching API responses across runs; None disables it
+        llm_cache_ttl : float
+            Seconds a cached API response stays valid
+        llm_cache_max_bytes : int
+            Size cap for cached responses before LRU eviction
+        history_path : str
+            Directory of the append-only user history store
+        compact_history : bool
+            Save history as packed DailyRecords instead of JSON lines
+        metrics : MetricsRegistry
+            Registry for stage timings, cache hits and API latency and
+            errors; instrumentation is off when not given. Batch and
+            service worker processes record into registries of their own,
+            merged into this one as their results come back
+        api_retries : int
+            Extra attempts after a timeout, connection error or 429/5xx
+        api_backoff : float
+            Base seconds for the jittered exponential backoff between attempts
+        breaker_threshold : int
+            Consecutive API calls failing after all their retries that open the
+            circuit breaker, after which the rule-based paths answer without
+            calling the provider
+        breaker_reset : float
+            Seconds the breaker stays open before one call probes the provider
+        hedge_after_ms : float
+            If set, virtue and nickname lookups return the rule-based answer
+            once this deadline passes; the API call keeps running in the
+            background and fills the caches for next time
+        """
+        # Constructor arguments, so batch workers can build an identical instance
+        self._config = dict(use_api=use_api, api_type=api_type, api_key=api_key,
+                            word_index_path=word_index_path, pronounceable=pronounceable,
+                            bigram_model_path=bigram_model_path, cache_size=cache_size,
+                            api_model=api_model, api_base_url=api_base_url,
+                            api_concurrency=api_concurrency, api_timeout=api_timeout,
+                            llm_cache_path=llm_cache_path, llm_cache_ttl=llm_cache_ttl,
+                            llm_cache_max_bytes=llm_cache_max_bytes, history_path=history_path,
+                            api_retries=api_retries, api_backoff=api_backoff,
+                            breaker_threshold=breaker_threshold, breaker_reset=breaker_reset,
+                            hedge_after_ms=hedge_after_ms, compact_history=compact_history,
+                            pronounceable_max_steps=pronounceable_max_steps)
+        self.use_api = use_api
+        self.api_type = api_type
+        self.api_key = api_key
+        self.word_index_path = word_index_path
+        self._word_index = None
+        self.pronounceable = pronounceable
+        self.pronounceable_max_steps = pronounceable_max_steps
+        self.bigram_model_path = bigram_model_path
+        self._bigram_model = None
+        self._anagram_cache = SignatureCache(cache_size)
+        self._virtue_cache = SignatureCache(cache_size)
+        self.api_model = api_model
+        self.api_base_url = api_base_url
+        self.api_concurrency = api_concurrency
+        self.api_timeout = api_timeout
+        self._providers = weakref.WeakKeyDictionary()  # event loop -> (LLMProvider, lifetime generator)
+        self._api_loop = None
+        self.llm_cache_path = llm_cache_path
+        self.llm_cache_ttl = llm_cache_ttl
+        self.llm_cache_max_bytes = llm_cache_max_bytes
+        self._llm_cache = None
+        self._cache_executor = None
+        self._llm_cache_lock = threading.Lock()
+        self.history_path = history_path
+        self.compact_history = compact_history
+        self._history_stores = {}
+        self.metrics = metrics
+        self.retry_policy = RetryPolicy(api_retries, api_backoff)
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset)
+        self.hedge_after_ms = hedge_after_ms
+        self._background_tasks = set()  # hedged API calls still running
+        
+        # Predefined virtues for rule-based generation
+        self.virtues = [
+            "Kindness", "Courage", "Wisdom", "Patience", "Honesty", "Compassion",
+            "Creativity", "Resilience", "Generosity", "Gratitude", "Humility",
+            "Joy", "Serenity", "Mindfulness", "Balance", "Authenticity", "Wonder",
+            "Empathy", "Integrity", "Determination", "Gentleness", "Presence"
+        ]
+        
+        # Nickname patterns with associated meanings
+        self.nickname_patterns = {
+            "prefix_patterns": ["Sunny", "Starry", "Gentle", "Bright", "Noble", "Kind", "Wise", "Brave"],
+            "suffix_patterns": ["heart", "soul", "mind", "spirit", "light", "smile", "spark"],
+            "diminutives": ["ie", "y", "kins", "boo", "bean", "pop", "love"]
+        }
+        
+        # Reflection prompts that subtly introduce no-self concepts
+        self.reflection_prompts = [
+            "How does today's anagram resonate with you in this moment?",
+            "What part of you does this virtue illuminate today?",
+            "If you embodied this virtue fully today, how might your experience change?",
+            "Notice how this quality can feel both familiar and new at once.",
+            "What happens when you imagine this quality as flowing through you rather than belonging to you?",
+            "How might this virtue appear differently in different contexts of your life?",
+            "If this quality were a guest visiting your home, how would you welcome it?",
+            "What if this virtue isn't something you have, but something you participate in?",
+            "How does this quality exist beyond the boundaries of what you call 'me'?",
+            "What happens if you allow this virtue to be present without claiming it as yours?"
+        ]
+    
+    def generate_anagrams(self, name: str, max_results: int = 5,
+                          real_words: Optional[bool] = None,
+                          pronounceable: Optional[bool] = None,
+                          time_budget_ms: Optional[float] = None,
+                          max_steps: Optional[int] = None) -> AnagramResults:
+        """
+        Generate anagrams from a name, allowing minor letter modifications
+        
+        Parameters:
+        -----------
+        name : str
+            The name to transform
+        max_results : int
+            Maximum number of anagrams to return
+        real_words : bool
+            Return dictionary words and phrases instead of letter jumbles.
+            Defaults to True when a word index is configured.
+        pronounceable : bool
+            Return the most pronounceable letter jumbles first, best first.
+            Defaults to the value given to the constructor.
+        time_budget_ms : float
+            Stop searching after this many milliseconds
+        max_steps : int
+            Stop searching after examining this many candidates
+        
+        Returns:
+        --------
+        AnagramResults
+            List of anagram strings; ``truncated`` is True when the budget
+            ran out before max_results were found
+        """
+        # Convert to lowercase for processing
+        name = name.lower().replace(" ", "")
+        signature = letter_signature(name)
+        
+        if real_words is None:
+            real_words = self.word_index_path is not None
+        if pronounceable is None:
+            pronounceable = self.pronounceable
+        mode = "words" if real_words else "pronounceable" if pronounceable else "jumble"
+        if mode == "pronounceable" and not all('a' <= c <= 'z' for c in signature):
+            # The bigram model only covers a-z; plain jumbles keep every character
+            mode = "jumble"
+        
+        # Without a caller budget the ranking gets a fixed step cap; the result
+        # is then deterministic, so it is cached even if cut short
+        default_cap = mode == "pronounceable" and time_budget_ms is None and max_steps is None
+        budget = SearchBudget(time_budget_ms, self.pronounceable_max_steps if default_cap else max_steps)
+        
+        # Every name with this signature shares one entry, computed with one
+        # spare result so dropping the caller's own name still leaves enough
+        key = (mode, signature, max_results)
+        candidates, truncated = self._cached_search(key, signature, max_results + 1, mode, budget, default_cap)
+        results = [a for a in candidates if a.replace(" ", "") != name]
+        if len(results) < max_results and len(candidates) > max_results and not truncated:
+            # Several phrases spelled the name itself (e.g. "alex and er" for
+            # Alexander); search again for this name with them excluded
+            candidates, truncated = self._cached_search(key + (name,), signature, max_results, mode,
+                                                        budget, default_cap, exclude=(name,))
+            results = list(candidates)
+        return AnagramResults(results[:max_results], truncated=truncated)
+    
+    def _cached_search(self, key: tuple, signature: str, limit: int, mode: str, budget: SearchBudget,
+                       default_cap: bool, exclude: Sequence[str] = ()) -> Tuple[Tuple[str, ...], bool]:
+        """(candidates, truncated) for a cache key, searching on a miss"""
+        cached = self._anagram_cache.get(key)
+        if cached is not None:
+            if self.metrics is not None:
+                self.metrics.count("anagrams.cache_hits")
+            return cached
+        steps = budget.steps
+        with self._stage(f"anagrams.search.{mode}"):
+            candidates = self._search_anagrams(signature, limit, mode, budget, exclude)
+        truncated = budget.exhausted
+        if not truncated or default_cap:
+            self._anagram_cache.put(key, (candidates, truncated))
+        if self.metrics is not None:
+            self.metrics.count("anagrams.cache_misses")
+            self.metrics.count("anagrams.candidates_examined", budget.steps - steps)
+            self.metrics.count("anagrams.truncated", truncated)
+        return candidates, truncated
+    
+    def _search_anagrams(self, signature: str, limit: int, mode: str, budget: SearchBudget,
+                         exclude: Sequence[str] = ()) -> Tuple[str, ...]:
+        """Run an uncached anagram search over a sorted-letter signature"""
+        if mode == "words":
+            return tuple(self.get_word_index().phrases(signature, limit, exclude=exclude, budget=budget))
+        
+        # For demonstration, we'll implement a simple algorithm
+        # that swaps, adds, or removes a single letter
+        
+        results = []
+        seen = set(exclude)
+        
+        # Try pure anagrams first, then with letter modifications
+        start = signature_arrangement(signature)
+        candidates = itertools.chain(distinct_permutations(start), one_letter_variants(start))
+        if mode == "pronounceable":
+            results = pronounceable_anagrams(signature, self.get_bigram_model(), limit, exclude=exclude,
+                                             budget=budget)
+            seen.update(results)
+            if budget.exhausted or len(results) >= limit:
+                return tuple(results)
+            candidates = one_letter_variants(start)
+        for anagram in candidates:
+            if not budget.tick():
+                break
+            if anagram not in seen:
+                results.append(anagram)
+                seen.add(anagram)
+                if len(results) >= limit:
+                    break
+        
+        return tuple(results)
+    
+    def cache_stats(self) -> Dict[str, Dict]:
+        """Hit/miss counters for the anagram, virtue and API response caches"""
+        stats = {"anagrams": self._anagram_cache.stats(), "virtues": self._virtue_cache.stats()}
+        if self._llm_cache is not None:
+            stats["llm"] = self._llm_cache.stats()
+        return stats
+    
+    def _stage(self, name: str):
+        """Timer for one stage, or a shared no-op context when metrics are off"""
+        return _NOOP if self.metrics is None else self.metrics.timer(name)
+    
+    def get_word_index(self) -> WordIndex:
+        """Open the configured word index on first use"""
+        if self._word_index is None:
+            if self.word_index_path is None:
+                raise ValueError("Dictionary anagrams need a word_index_path (see build_word_index)")
+            self._word_index = WordIndex(self.word_index_path)
+        return self._word_index
+    
+    def get_bigram_model(self) -> "np.ndarray":
+        """Load the configured bigram table, or train the built-in one, on first use"""
+        if self._bigram_model is None:
+            if self.bigram_model_path is not None:
+                import numpy as np
+                self._bigram_model = np.load(self.bigram_model_path)
+            else:
+                self._bigram_model = train_bigram_model(_SAMPLE_WORDS.split())
+        return self._bigram_model
+    
+    def associate_virtue_with_anagram(self, anagram: str, name: str) -> str:
+        """
+        Associate a virtue with an anagram
+        
+        Parameters:
+        -----------
+        anagram : str
+            The anagram to associate with a virtue
+        name : str
+            The original name
+        
+        Returns:
+        --------
+        str
+            A virtue association
+        """
+        key = (anagram, letter_signature(name.lower().replace(" ", "")))
+        virtue = self._virtue_cache.get(key)
+        if self.metrics is not None:
+            self.metrics.count("virtues.cache_hits" if virtue is not None else "virtues.cache_misses")
+        if virtue is not None:
+            return virtue
+        
+        if self.use_api and self.api_key:
+            # Caches the API's answer itself; a rule-based fallback isn't
+            # cached, so the API is asked again once it recovers
+            return self._get_virtue_from_api(anagram, name)
+        virtue = self._rule_based_virtue(anagram)
+        self._virtue_cache.put(key, virtue)
+        return virtue
+    
+    def _rule_based_virtue(self, anagram: str) -> str:
+        # Rule-based approach
+        # Simple hash function to select a virtue
+        hash_value = sum(ord(c) for c in anagram) % len(self.virtues)
+        return self.virtues[hash_value]
+    
+    def associate_virtues(self, anagrams: List[str], name: str) -> List[str]:
+        """
+        Associate a virtue with each of several anagrams of one name
+        
+        With the API enabled, all uncached anagrams go to the model in one
+        request (see associate_virtues_async) instead of one per anagram.
+        
+        Parameters:
+        -----------
+        anagrams : List[str]
+            The anagrams to associate with virtues
+        name : str
+            The original name
+        
+        Returns:
+        --------
+        List[str]
+            One virtue per anagram, in the same order
+        """
+        if not (self.use_api and self.api_key):
+            return [self.associate_virtue_with_anagram(anagram, name) for anagram in anagrams]
+        return self._run_api(self.associate_virtues_async(anagrams, name))
+    
+    async def associate_virtues_async(self, anagrams: List[str], name: str) -> List[str]:
+        """
+        Async version of associate_virtues
+        
+        Uncached anagrams are packed into a single JSON prompt and the reply
+        is checked item by item. Anything missing or invalid in the reply is
+        retried with its own request, and if that fails too it falls back to
+        the rule-based virtue for that item only.
+        """
+        if not (self.use_api and self.api_key):
+            return self.associate_virtues(anagrams, name)
+        
+        signature = letter_signature(name.lower().replace(" ", ""))
+        virtues = {anagram: self._virtue_cache.get((anagram, signature)) for anagram in anagrams}
+        missing = [anagram for anagram, virtue in virtues.items() if virtue is None]
+        
+        if len(missing) > 1:
+            virtues.update(await self._get_virtues_from_api_async(missing, name))
+        for anagram in missing:
+            if virtues[anagram] is None:
+                try:
+                    virtues[anagram] = await self._request_virtue(anagram, name)
+                except Exception as e:
+                    self._api_failed(e)
+                    virtues[anagram] = self._rule_based_virtue(anagram)
+                    continue
+            self._virtue_cache.put((anagram, signature), virtues[anagram])
+        
+        return [virtues[anagram] for anagram in anagrams]
+    
+    async def _get_virtues_from_api_async(self, anagrams: List[str], name: str) -> Dict[str, str]:
+        """Ask for all virtues in one request, returning only the items that came back valid"""
+        items = [{"id": i, "anagram": anagram} for i, anagram in enumerate(anagrams)]
+        try:
+            parsed = await self._complete(
+                "You are an expert in finding meaningful virtue associations in words.",
+                f"For each anagram below, derived from the name '{name}', find a virtue or positive quality that could be associated with it.\n"
+                f"Anagrams (JSON): {json.dumps(items)}\n"
+                "Respond with only a JSON array of objects with 'id' and 'virtue' fields, one per anagram, where each virtue is a single word.",
+                max_tokens=20 * len(anagrams) + 20,
+                # Tolerate prose or code fences around the array
+                parse=lambda response: json.loads(response[response.index("["):response.rindex("]") + 1]),
+            )
+        except Exception as e:
+            self._api_failed(e)
+            return {}
+        
+        results = {}
+        for item in parsed if isinstance(parsed, list) else []:
+            if not isinstance(item, dict):
+                continue
+            idx, virtue = item.get("id"), item.get("virtue")
+            if isinstance(idx, int) and 0 <= idx < len(anagrams) and isinstance(virtue, str) \
+                    and virtue.strip() and len(virtue.strip()) <= 40:
+                results[anagrams[idx]] = virtue.strip()
+        return results
+    
+    async def associate_virtue_with_anagram_async(self, anagram: str, name: str) -> str:
+        """Async version of associate_virtue_with_anagram"""
+        if not (self.use_api and self.api_key):
+            return self.associate_virtue_with_anagram(anagram, name)
+        
+        key = (anagram, letter_signature(name.lower().replace(" ", "")))
+        virtue = self._virtue_cache.get(key)
+        if self.metrics is not None:
+            self.metrics.count("virtues.cache_hits" if virtue is not None else "virtues.cache_misses")
+        if virtue is None:
+            virtue = await self._get_virtue_from_api_async(anagram, name)
+        return virtue
+    
+    def _get_virtue_from_api(self, anagram: str, name: str) -> str:
+        """Use AI API to get virtue associations"""
+        return self._run_api(self._get_virtue_from_api_async(anagram, name))
+    
+    async def _get_virtue_from_api_async(self, anagram: str, name: str) -> str:
+        key = (anagram, letter_signature(name.lower().replace(" ", "")))
+        
+        async def fetch():
+            try:
+                virtue = await self._request_virtue(anagram, name)
+            except Exception as e:
+                self._api_failed(e)
+                return None
+            self._virtue_cache.put(key, virtue)
+            return virtue
+        
+        virtue = await self._hedged(fetch())
+        return virtue if virtue is not None else self._rule_based_virtue(anagram)
+    
+    async def _request_virtue(self, anagram: str, name: str) -> str:
+        return await self._complete(
+            "You are an expert in finding meaningful virtue associations in words.",
+            f"Find a virtue or positive quality that could be associated with the word '{anagram}' which is derived from the name '{name}'. Respond with just the single virtue word.",
+            max_tokens=10,
+        )
+    
+    def generate_nicknames(self, name: str, count: int = 3,
+                           rng: Optional[random.Random] = None) -> List[Dict]:
+        """
+        Generate nicknames based on a name
+        
+        Parameters:
+        -----------
+        name : str
+            The name to transform into nicknames
+        count : int
+            Number of nicknames to generate
+        rng : random.Random
+            Source for pattern choices; the global random module by default
+        
+        Returns:
+        --------
+        List[Dict]
+            List of nickname dictionaries with name and meaning
+        """
+        if self.use_api and self.api_key:
+            return self._get_nicknames_from_api(name, count, rng)
+        return self._rule_based_nicknames(name, count, rng)
+    
+    def _rule_based_nicknames(self, name: str, count: int,
+                              rng: Optional[random.Random] = None) -> List[Dict]:
+        # Simple rule-based approach
+        rng = rng or random
+        results = []
+        name = name.lower()
+        
+        # Patterns live in rule_nickname so compact records can rebuild them
+        # First letter + diminutive
+        for dim in self.nickname_patterns["diminutives"]:
+            if len(results) < count:
+                results.append(rule_nickname("diminutive", dim, name))
+        
+        # First syllable transformation
+        if len(results) < count:
+            if len(name) >= 3:
+                results.append(rule_nickname("syllable", "ie", name))
+        
+        # Prefix + part of name
+        if len(results) < count:
+            prefix = rng.choice(self.nickname_patterns["prefix_patterns"])
+            results.append(rule_nickname("prefix", prefix, name))
+        
+        # Name + suffix
+        if len(results) < count:
+            suffix = rng.choice(self.nickname_patterns["suffix_patterns"])
+            results.append(rule_nickname("suffix", suffix, name))
+        
+        return results[:count]
+    
+    async def generate_nicknames_async(self, name: str, count: int = 3,
+                                       rng: Optional[random.Random] = None) -> List[Dict]:
+        """Async version of generate_nicknames"""
+        if self.use_api and self.api_key:
+            return await self._get_nicknames_from_api_async(name, count, rng)
+        return self.generate_nicknames(name, count, rng=rng)
+    
+    def _get_nicknames_from_api(self, name: str, count: int,
+                                rng: Optional[random.Random] = None) -> List[Dict]:
+        """Use AI API to generate nicknames"""
+        return self._run_api(self._get_nicknames_from_api_async(name, count, rng))
+    
+    async def _get_nicknames_from_api_async(self, name: str, count: int,
+                                            rng: Optional[random.Random] = None) -> List[Dict]:
+        async def fetch():
+            try:
+                return await self._complete(
+                    "You generate meaningful, positive nicknames based on people's names.",
+                    f"Generate {count} nicknames for someone named '{name}'. For each nickname, provide a short meaning that connects to a positive quality. Format as JSON array with 'nickname' and 'meaning' fields.",
+                    max_tokens=250,
+                    parse=json.loads,
+                )
+            except Exception as e:
+                self._api_failed(e)
+                return None
+        
+        nicknames = await self._hedged(fetch())
+        # Fall back to rule-based approach
+        return nicknames if nicknames is not None else self._rule_based_nicknames(name, count, rng)
+    
+    async def _get_provider(self) -> "LLMProvider":
+        """
+        Return the provider for the running event loop, creating it on first use
+        
+        Each provider is tied to its loop's shutdown, so callers that never
+        call aclose() (e.g. one asyncio.run per request) don't leak sessions:
+        see _provider_lifetime. Entries for loops closed some other way are
+        dropped here.
+        """
+        import asyncio
+        from .providers import make_provider
+        loop = asyncio.get_running_loop()
+        entry = self._providers.get(loop)
+        if entry is None:
+            for closed in [other for other in self._providers.keys() if other.is_closed()]:
+                del self._providers[closed]
+            provider = make_provider(self.api_type, self.api_key, model=self.api_model,
+                                     base_url=self.api_base_url,
+                                     max_concurrency=self.api_concurrency, timeout=self.api_timeout)
+            lifetime = self._provider_lifetime(loop, provider)
+            await lifetime.asend(None)
+            entry = self._providers[loop] = (provider, lifetime)
+        return entry[0]
+    
+    async def _provider_lifetime(self, loop, provider: "LLMProvider"):
+        """
+        Async generator parked at its yield for as long as ``provider`` is in use
+        
+        Event loops finalize unfinished async generators before closing
+        (asyncio.run does this), which runs the finally block on the loop
+        while it can still close the session; aclose() does the same early.
+        """
+        try:
+            yield
+        finally:
+            self._providers.pop(loop, None)
+            await provider.close()
+    
+    def _get_llm_cache(self) -> Optional[LLMCache]:
+        with self._llm_cache_lock:
+            if self._llm_cache is None and self.llm_cache_path is not None:
+                self._llm_cache = LLMCache(self.llm_cache_path, self.llm_cache_ttl, self.llm_cache_max_bytes)
+            return self._llm_cache
+    
+    async def _in_cache_thread(self, func, *args):
+        """Run a blocking LLMCache call off the event loop, so a locked database can't stall it"""
+        import asyncio
+        if self._cache_executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._cache_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="nameglow-cache")
+        return await asyncio.get_running_loop().run_in_executor(self._cache_executor, func, *args)
+    
+    async def _complete(self, system: str, prompt: str, max_tokens: int, parse=str.strip):
+        """
+        Ask the provider, going through the persistent response cache
+        
+        ``parse`` turns the reply text into the caller's result; a reply is
+        only cached once it parses, so malformed answers are asked again.
+        """
+        provider = await self._get_provider()
+        cache = self._llm_cache
+        if cache is None and self.llm_cache_path is not None:
+            # Opening it writes the schema, which can wait on another process's lock
+            cache = await self._in_cache_thread(self._get_llm_cache)
+        if cache is not None:
+            key = LLMCache.make_key(self.api_type, provider.model, system, prompt, max_tokens)
+            cached = await self._in_cache_thread(cache.get, key)
+            if self.metrics is not None:
+                self.metrics.count("llm_cache.hits" if cached is not None else "llm_cache.misses")
+            if cached is not None:
+                return parse(cached)
+        
+        response = await self._call_provider(provider, system, prompt, max_tokens)
+        result = parse(response)
+        if cache is not None:
+            await self._in_cache_thread(cache.put, key, response, self.api_type, provider.model)
+        return result
+    
+    async def _call_provider(self, provider: "LLMProvider", system: str, prompt: str,
+                             max_tokens: int) -> str:
+        """
+        One provider request with a per-attempt timeout, jittered retries
+        and the circuit breaker
+        
+        The breaker admits the call once and counts it once: retries run
+        inside the admitted call, and only a call that still fails after
+        them is recorded as a failure. Raises ProviderUnavailable without
+        calling out while the breaker is open, and the last error once the
+        retries are used up.
+        """
+        import asyncio
+        if not self.breaker.allow():
+            if self.metrics is not None:
+                self.metrics.count("api.short_circuited")
+            raise ProviderUnavailable(f"{self.api_type} circuit breaker is open")
+        try:
+            for attempt in range(self.retry_policy.retries + 1):
+                if self.metrics is not None:
+                    self.metrics.count("api.requests")
+                start = time.perf_counter()
+                try:
+                    # The provider applies api_timeout per request, after its own queueing
+                    response = await provider.complete(system, prompt, max_tokens)
+                except Exception as e:
+                    if self.metrics is not None:
+                        self.metrics.count("api.timeouts" if isinstance(e, asyncio.TimeoutError) else "api.errors")
+                    # Stop retrying once other calls have opened the breaker
+                    if (attempt < self.retry_policy.retries and is_retryable(e)
+                            and self.breaker.state != CircuitBreaker.OPEN):
+                        await asyncio.sleep(self.retry_policy.delay(attempt))
+                        continue
+                    if self.breaker.record_failure():
+                        print(f"API error: {self.api_type} provider failing, using rule-based answers "
+                              f"for {self.breaker.reset_timeout:g}s")
+                    raise
+                self.breaker.record_success()
+                if self.metrics is not None:
+                    self.metrics.observe("api.latency", (time.perf_counter() - start) * 1000)
+                return response
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+    
+    async def _hedged(self, coro):
+        """
+        Await ``coro``, or give up on it after hedge_after_ms
+        
+        Returns None when the deadline passes first; the call keeps running
+        in the background so its answer still lands in the caches.
+        """
+        if self.hedge_after_ms is None:
+            return await coro
+        import asyncio
+        task = asyncio.ensure_future(coro)
+        done, _ = await asyncio.wait({task}, timeout=self.hedge_after_ms / 1000)
+        if task in done:
+            return task.result()
+        if self.metrics is not None:
+            self.metrics.count("api.hedged")
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return None
+    
+    def _api_failed(self, error: Exception):
+        # Open-breaker refusals are expected and already announced once
+        if not isinstance(error, ProviderUnavailable):
+            print(f"API error: {str(error) or type(error).__name__}")
+    
+    def _run_api(self, coro):
+        """Run an API coroutine to completion from synchronous code"""
+        if self._api_loop is None:
+            from .providers import _BackgroundLoop
+            self._api_loop = _BackgroundLoop()
+        return self._api_loop.run(coro)
+    
+    async def __aenter__(self) -> "NameGlow":
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+    
+    async def aclose(self):
+        """
+        Close the provider connections opened on the running event loop
+        
+        Also called on leaving ``async with NameGlow(...) as nameglow:``.
+        """
+        import asyncio
+        loop = asyncio.get_running_loop()
+        pending = [task for task in self._background_tasks if task.get_loop() is loop]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        entry = self._providers.get(loop)
+        if entry is not None:
+            await entry[1].aclose()
+    
+    def close(self):
+        """Close provider connections used by the synchronous methods"""
+        if self._api_loop is not None:
+            self._api_loop.run(self.aclose())
+            self._api_loop.stop()
+            self._api_loop = None
+        if self._cache_executor is not None:
+            self._cache_executor.shutdown(wait=True)
+            self._cache_executor = None
+        if self._llm_cache is not None:
+            self._llm_cache.close()
+            self._llm_cache = None
+    
+    def get_reflection_prompt(self, rng: Optional[random.Random] = None) -> str:
+        """Return a randomly selected reflection prompt"""
+        return (rng or random).choice(self.reflection_prompts)
+    
+    @staticmethod
+    def user_rng(name: str, date: str, seed=None) -> random.Random:
+        """
+        Random generator for one user's content on one day
+        
+        Seeded from a hash of the normalized name, date, and optional run
+        seed (not the built-in hash(), which differs between processes), so
+        the same user gets the same choices whichever worker serves them.
+        """
+        key = f"{seed}|{name.lower().replace(' ', '')}|{date}".encode('utf-8')
+        return random.Random(int.from_bytes(hashlib.sha256(key).digest()[:8], 'big'))
+    
+    def generate_daily_content(self, name: str, time_budget_ms: Optional[float] = None,
+                               max_steps: Optional[int] = None, date: Optional[str] = None,
+                               rng: Optional[random.Random] = None) -> Dict:
+        """
+        Generate daily content for a user
+        
+        Parameters:
+        -----------
+        name : str
+            The user's name
+        time_budget_ms : float
+            Time limit for the anagram search
+        max_steps : int
+            Candidate limit for the anagram search
+        date : str
+            Date to generate for (YYYY-MM-DD); today by default
+        rng : random.Random
+            Source for the nickname and reflection prompt choices
+        
+        Returns:
+        --------
+        Dict
+            Dictionary with anagram, virtue, nicknames, and reflection prompt
+        """
+        with self._stage("daily.total"):
+            date = date or datetime.date.today().isoformat()
+            
+            # Get anagrams
+            with self._stage("daily.anagrams"):
+                anagrams = self.generate_anagrams(name, max_results=3, time_budget_ms=time_budget_ms,
+                                                  max_steps=max_steps)
+            
+            # Select one anagram and associate virtue
+            selected_anagram = anagrams[0] if anagrams else name[::-1]  # Fallback to reverse name
+            with self._stage("daily.virtue"):
+                virtue = self.associate_virtue_with_anagram(selected_anagram, name)
+            
+            # Generate nicknames
+            with self._stage("daily.nicknames"):
+                nicknames = self.generate_nicknames(name, count=2, rng=rng)
+            
+            # Get reflection prompt
+            reflection = self.get_reflection_prompt(rng=rng)
+            
+            return self._daily_record(date, name, anagrams, selected_anagram, virtue, nicknames, reflection)
+    
+    async def generate_daily_content_async(self, name: str, time_budget_ms: Optional[float] = None,
+                                           max_steps: Optional[int] = None, date: Optional[str] = None,
+                                           rng: Optional[random.Random] = None) -> Dict:
+        """
+        Async version of generate_daily_content
+        
+        The anagram search runs in the loop's default executor, and the
+        virtue and nickname API calls are awaited together, so many users
+        can be in flight at once (up to api_concurrency requests).
+        """
+        import asyncio
+        with self._stage("daily.total"):
+            date = date or datetime.date.today().isoformat()
+            
+            search = functools.partial(self.generate_anagrams, name, max_results=3,
+                                       time_budget_ms=time_budget_ms, max_steps=max_steps)
+            with self._stage("daily.anagrams"):
+                anagrams = await asyncio.get_running_loop().run_in_executor(None, search)
+            
+            selected_anagram = anagrams[0] if anagrams else name[::-1]  # Fallback to reverse name
+            # Virtue and nicknames overlap, so they share one stage
+            with self._stage("daily.virtue_nicknames"):
+                virtue, nicknames = await asyncio.gather(
+                    self.associate_virtue_with_anagram_async(selected_anagram, name),
+                    self.generate_nicknames_async(name, count=2, rng=rng),
+                )
+            reflection = self.get_reflection_prompt(rng=rng)
+            
+            return self._daily_record(date, name, anagrams, selected_anagram, virtue, nicknames, reflection)
+    
+    @staticmethod
+    def _daily_record(date: str, name: str, anagrams: AnagramResults, selected_anagram: str,
+                      virtue: str, nicknames: List[Dict], reflection: str) -> Dict:
+        return {
+            "date": date,
+            "name": name,
+            "anagram": selected_anagram,
+            "virtue": virtue,
+            "nicknames": nicknames,
+            "reflection_prompt": reflection,
+            "alternative_anagrams": anagrams[1:] if len(anagrams) > 1 else [],
+            "search_truncated": anagrams.truncated
+        }
+    
+    def build_schedule(self, name: str, days: int = 30, start_date: Optional[str] = None,
+                       seed=None, time_budget_ms: Optional[float] = None,
+                       max_steps: Optional[int] = None) -> ContentSchedule:
+        """
+        Precompute a user's content for the next ``days`` days
+        
+        The anagram search, virtue lookups and nickname generation all run
+        here, once, so serving a day afterwards (ContentSchedule.content_for)
+        is a single array lookup. Anagrams, virtues and reflection prompts
+        each rotate without repeating until their pool is used up.
+        
+        Parameters:
+        -----------
+        name : str
+            The user's name
+        days : int
+            Number of consecutive days to schedule
+        start_date : str
+            First scheduled day (YYYY-MM-DD); today by default
+        seed : any
+            Run seed mixed into the user's shuffles, as in user_rng
+        time_budget_ms : float
+            Time limit for the anagram search
+        max_steps : int
+            Candidate limit for the anagram search
+        
+        Returns:
+        --------
+        ContentSchedule
+            Compact schedule that can be saved, loaded and served by date
+        """
+        start_date = start_date or datetime.date.today().isoformat()
+        rng = self.user_rng(name, start_date, seed)
+        
+        anagrams = self.generate_anagrams(name, max_results=days, time_budget_ms=time_budget_ms,
+                                          max_steps=max_steps)
+        pool = list(anagrams) or [name[::-1]]  # Fallback to reverse name
+        
+        # One (batched) virtue lookup for the whole anagram pool; virtues the
+        # API invents outside our table join the rotation too
+        virtues = list(self.virtues)
+        associated = []
+        for virtue in self.associate_virtues(pool, name):
+            if virtue not in virtues:
+                virtues.append(virtue)
+            associated.append(virtues.index(virtue))
+        virtue_order = list(range(len(virtues)))
+        rng.shuffle(virtue_order)
+        day_virtues = rotate_virtues([associated[day % len(pool)] for day in range(days)],
+                                     virtue_order, days)
+        
+        prompt_order = list(range(len(self.reflection_prompts)))
+        rng.shuffle(prompt_order)
+        
+        nicknames = self.generate_nicknames(name, count=len(self.nickname_patterns["diminutives"]) + 3,
+                                            rng=rng)
+        
+        rows = array("H")
+        for day in range(days):
+            rows.extend((day % len(pool), day_virtues[day],
+                         prompt_order[day % len(prompt_order)], day % max(len(nicknames), 1)))
+        
+        return ContentSchedule(name, start_date, pool, virtues, self.reflection_prompts, nicknames,
+                               rows, anagrams.truncated)
+    
+    def generate_daily_content_batch(self, names: Iterable[str], workers: Optional[int] = None,
+                                     chunksize: int = 64, seed=None, date: Optional[str] = None,
+                                     time_budget_ms: Optional[float] = None,
+                                     max_steps: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Generate daily content for many users across a process pool
+        
+        Names are sent to workers in chunks and results are yielded in input
+        order as soon as each chunk completes. Only a few chunks per worker
+        are in flight at once, so ``names`` can be a lazy stream of any size.
+        
+        Parameters:
+        -----------
+        names : Iterable[str]
+            User names to generate content for
+        workers : int
+            Number of worker processes (all CPUs by default); 1 runs inline
+        chunksize : int
+            Names per task sent to a worker
+        seed : any
+            Run seed mixed into each user's random choices (see user_rng)
+        date : str
+            Date to generate for (YYYY-MM-DD); today by default
+        time_budget_ms : float
+            Per-user time limit for the anagram search
+        max_steps : int
+            Per-user candidate limit for the anagram search
+        
+        Returns:
+        --------
+        Iterator[Dict]
+            One generate_daily_content result per name, in input order
+        """
+        date = date or datetime.date.today().isoformat()
+        options = dict(date=date, seed=seed, time_budget_ms=time_budget_ms, max_steps=max_steps)
+        chunks = _chunked(names, chunksize)
+        
+        if workers == 1:
+            for chunk in chunks:
+                yield from _daily_content_chunk(self, chunk, options)
+            return
+        
+        from concurrent.futures import ProcessPoolExecutor
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                                 initargs=(self._config, self.metrics is not None)) as pool:
+            pending = deque()
+            max_pending = 2 * workers
+            for chunk in chunks:
+                pending.append(pool.submit(_run_batch_chunk, chunk, options))
+                if len(pending) >= max_pending:
+                    yield from self._worker_results(pending.popleft().result())
+            while pending:
+                yield from self._worker_results(pending.popleft().result())
+    
+    def _worker_results(self, chunk_result: Tuple[List[Dict], Optional[Dict]]) -> List[Dict]:
+        """Content from one _run_batch_chunk call, merging the worker's metrics into ours"""
+        results, snapshot = chunk_result
+        if snapshot is not None and self.metrics is not None:
+            self.metrics.merge(snapshot)
+        return results
+    
+    def display_content(self, content: Dict):
+        """
+        Display the generated content in a visually appealing way in the notebook
+        
+        Parameters:
+        -----------
+        content : Dict
+            The content to display
+        """
+        from .render import render_card
+        from IPython.display import display, HTML
+        display(HTML(render_card(content)))
+    
+    def get_history_store(self, path: Optional[str] = None) -> HistoryStore:
+        """
+        Open a history store, importing the legacy JSON file on first use
+        
+        If ``nameglow_data.json`` (the old whole-file format) sits next to the
+        store directory, its entries are migrated once and it is renamed.
+        
+        ``path`` may also name a JSON file in the old format, as the old
+        ``filepath`` arguments did: the default ``nameglow_data.json`` maps to
+        history_path and any other ``<name>.json`` to a ``<name>_history``
+        store beside it, and the file is imported into that store.
+        """
+        path = path or self.history_path
+        default_legacy = os.path.join(os.path.dirname(os.path.abspath(self.history_path)), "nameglow_data.json")
+        if path.endswith(".json"):
+            legacy = os.path.abspath(path)
+            path = self.history_path if legacy == default_legacy else os.path.splitext(path)[0] + "_history"
+        else:
+            legacy = os.path.join(os.path.dirname(os.path.abspath(path)), "nameglow_data.json")
+        store = self._history_stores.get(path)
+        if store is None:
+            store = HistoryStore(path, codec=self.record_codec() if self.compact_history else None)
+            # Checked again under the store lock; this only skips the lock when there's nothing to do
+            if os.path.exists(legacy) or os.path.exists(legacy + ".migrating"):
+                count = store.migrate_json(legacy)
+                if count:
+                    print(f"Migrated {count} saved entries from {legacy} to {path}")
+            self._history_stores[path] = store
+        return store
+    
+    def record_codec(self) -> RecordCodec:
+        """Codec between content dicts and compact DailyRecords, for this instance's tables"""
+        return RecordCodec.from_nameglow(self)
+    
+    def save_user_content(self, user_id: str, content: Dict, filepath: Optional[str] = None):
+        """
+        Append the generated content to the user's saved history
+        
+        Parameters:
+        -----------
+        user_id : str
+            Unique identifier for the user
+        content : Dict
+            The content to save
+        filepath : str
+            History store directory, or an old-format JSON file (see
+            get_history_store); defaults to history_path
+        """
+        try:
+            store = self.get_history_store(filepath)
+            store.append(user_id, content)
+            print(f"Data saved successfully to {store.path}")
+        
+        except Exception as e:
+            print(f"Error saving data: {e}")
+    
+    def load_user_history(self, user_id: str, since: Optional[str] = None,
+                          filepath: Optional[str] = None) -> List[Dict]:
+        """
+        Load a user's saved content entries, oldest first
+        
+        Parameters:
+        -----------
+        user_id : str
+            Unique identifier for the user
+        since : str
+            Only return entries dated on or after this YYYY-MM-DD date
+        filepath : str
+            History store directory, or an old-format JSON file (see
+            get_history_store); defaults to history_path
+        
+        Returns:
+        --------
+        List[Dict]
+            The saved content dictionaries
+        """
+        return self.get_history_store(filepath).load_user_history(user_id, since=since)
+
+# Process pool helpers for generate_daily_content_batch (module level so they pickle)
+_worker_nameglow: Optional[NameGlow] = None
+
+
+def _chunked(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _daily_content_chunk(nameglow: NameGlow, names: List[str], options: Dict) -> List[Dict]:
+    date, seed = options["date"], options["seed"]
+    return [
+        nameglow.generate_daily_content(name, time_budget_ms=options["time_budget_ms"],
+                                        max_steps=options["max_steps"], date=date,
+                                        rng=NameGlow.user_rng(name, date, seed))
+        for name in names
+    ]
+
+
+def _init_batch_worker(config: Dict, metrics: bool = False):
+    global _worker_nameglow
+    _worker_nameglow = NameGlow(**config, metrics=MetricsRegistry() if metrics else None)
+
+
+def _run_batch_chunk(names: List[str], options: Dict) -> Tuple[List[Dict], Optional[Dict]]:
+    """A chunk's content, plus the worker's metrics recorded since the last chunk"""
+    results = _daily_content_chunk(_worker_nameglow, names, options)
+    metrics = _worker_nameglow.metrics
+    return results, metrics.snapshot(reset=True) if metrics is not None else None
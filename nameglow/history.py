@@ -0,0 +1,438 @@
+"""Append-only, indexed store of users' saved content"""
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import struct
+from typing import List, Dict, Optional, Iterator, Tuple
+
+from .records import DailyRecord, RecordCodec
+
+# A history store is a directory of append-only segments plus an index of
+# fixed-size binary records, one per saved entry:
+#   user key (16-byte BLAKE2b of user_id), date as YYYYMMDD u32,
+#   segment number u32, byte offset u64, entry length u32
+# The index is partitioned by the first byte of the user key into
+# index/00.bin .. index/ff.bin, so a lookup only reads its user's partition.
+# Segments are JSONL (segment-NNNNNN.jsonl) or, with a RecordCodec, packed
+# DailyRecords (segment-NNNNNN.bin) decoded against the tables saved in
+# tables.json.
+# Writers hold an exclusive lock on the "lock" file while appending (flock,
+# or msvcrt.locking on Windows), so several processes can save concurrently
+# without losing entries.
+_INDEX_RECORD = struct.Struct("<16sIIQI")
+
+
+def _user_key(user_id: str) -> bytes:
+    return hashlib.blake2b(user_id.encode("utf-8"), digest_size=16).digest()
+
+
+def _lock_file(f, lock: bool):
+    """Take (or release) an exclusive, blocking lock on an open file"""
+    try:
+        import fcntl
+    except ImportError:
+        # Windows: lock the file's first byte; LK_LOCK gives up after about
+        # 10 s, so keep retrying to block like flock
+        import msvcrt
+        f.seek(0)
+        if not lock:
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            return
+        while True:
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+    fcntl.flock(f, fcntl.LOCK_EX if lock else fcntl.LOCK_UN)
+
+
+def _date_number(date: Optional[str]) -> int:
+    try:
+        return int(str(date)[:10].replace("-", ""))
+    except ValueError:
+        return 0
+
+
+class HistoryStore:
+    """
+    Append-only store of generated content per user
+    
+    Saving one entry is O(1): an entry appended to the current segment and
+    a record appended to the user's index partition. Lookups scan that one
+    partition for the user's records (about 1/256 of the index, nothing kept
+    in memory between lookups) and then seek straight to their entries.
+    
+    With a ``codec``, new entries are stored as packed DailyRecords, about
+    a tenth the size of the JSON lines. Stores can mix both kinds of
+    segment, so existing JSONL history stays readable.
+    
+    With ``readonly``, the directory must already exist and nothing in it
+    is created or converted; append raises.
+    """
+    
+    def __init__(self, path: str = "nameglow_history", segment_bytes: int = 64 * 1024 * 1024,
+                 fsync: bool = False, codec: Optional[RecordCodec] = None, readonly: bool = False):
+        self.path = path
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self.readonly = readonly
+        self.compact = codec is not None and not readonly
+        self._index_dir = os.path.join(path, "index")
+        self._legacy_index_path = os.path.join(path, "index.bin")
+        self._lock_path = os.path.join(path, "lock")
+        self._tables_path = os.path.join(path, "tables.json")
+        self._migration_path = os.path.join(path, "migration.json")
+        self._segment_files: Dict[int, str] = {}
+        self._codec = None
+        if readonly:
+            if not os.path.isdir(path):
+                raise FileNotFoundError(f"No history store at {path}")
+            return
+        os.makedirs(self._index_dir, exist_ok=True)
+        if os.path.exists(self._legacy_index_path):
+            with self._locked():
+                self._split_legacy_index()
+        if codec is not None:
+            with self._locked():
+                if not os.path.exists(self._tables_path):
+                    tmp = f"{self._tables_path}.{os.getpid()}.tmp"
+                    with open(tmp, "w") as f:
+                        json.dump(codec.tables(), f)
+                    os.replace(tmp, self._tables_path)
+    
+    @property
+    def codec(self) -> Optional[RecordCodec]:
+        """
+        Codec for the tables saved with this store, if it has any
+        
+        Entries are always encoded against the saved tables rather than the
+        ones passed in, so entries written before a table edit still decode.
+        """
+        if self._codec is None and os.path.exists(self._tables_path):
+            with open(self._tables_path) as f:
+                self._codec = RecordCodec.from_tables(json.load(f))
+        return self._codec
+    
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        with open(self._lock_path, "a") as lock:
+            _lock_file(lock, True)
+            try:
+                yield
+            finally:
+                _lock_file(lock, False)
+    
+    def _segment_path(self, number: int, extension: Optional[str] = None) -> str:
+        if extension is not None:
+            return os.path.join(self.path, f"segment-{number:06d}{extension}")
+        path = self._segment_files.get(number)
+        if path is None:
+            path = self._segment_path(number, ".bin")
+            if not os.path.exists(path):
+                path = self._segment_path(number, ".jsonl")
+            self._segment_files[number] = path
+        return path
+    
+    def _partition_path(self, key: bytes) -> str:
+        return os.path.join(self._index_dir, f"{key[0]:02x}.bin")
+    
+    def _index_files(self) -> List[str]:
+        """Index partitions, or the single index.bin of a read-only, unconverted store"""
+        if os.path.exists(self._legacy_index_path):
+            return [self._legacy_index_path]
+        try:
+            names = sorted(n for n in os.listdir(self._index_dir) if n.endswith(".bin"))
+        except FileNotFoundError:
+            return []
+        return [os.path.join(self._index_dir, n) for n in names]
+    
+    def _split_legacy_index(self):
+        """
+        Partition the single index.bin written by earlier versions (caller
+        holds the lock)
+        
+        The partitions are built in a scratch directory that replaces the
+        empty index directory in one rename, so a crash leaves either the old
+        index or the complete new one.
+        """
+        if not os.path.exists(self._legacy_index_path):
+            return
+        if not os.listdir(self._index_dir):
+            scratch = self._index_dir + ".tmp"
+            shutil.rmtree(scratch, ignore_errors=True)
+            os.makedirs(scratch)
+            size = _INDEX_RECORD.size
+            with open(self._legacy_index_path, "rb") as f:
+                while True:
+                    data = f.read(65536 * size)
+                    usable = len(data) - len(data) % size
+                    if not usable:
+                        break
+                    partitions: Dict[int, bytearray] = {}
+                    for pos in range(0, usable, size):
+                        partitions.setdefault(data[pos], bytearray()).extend(data[pos:pos + size])
+                    for part, records in partitions.items():
+                        with open(os.path.join(scratch, f"{part:02x}.bin"), "ab") as out:
+                            out.write(records)
+            os.rmdir(self._index_dir)
+            os.replace(scratch, self._index_dir)
+        os.remove(self._legacy_index_path)
+    
+    def segments(self) -> List[str]:
+        """Paths of all segment files, oldest first"""
+        names = sorted(n for n in os.listdir(self.path)
+                       if n.startswith("segment-") and n.endswith((".jsonl", ".bin")))
+        return [os.path.join(self.path, n) for n in names]
+    
+    def append(self, user_id: str, content: Dict):
+        """Append one content entry to a user's history"""
+        if self.readonly:
+            raise PermissionError(f"{self.path} was opened read-only")
+        with self._locked():
+            self._recover_migration()
+            self._append_locked(user_id, content)
+    
+    def _append_locked(self, user_id: str, content: Dict):
+        if self.compact:
+            entry = self.codec.pack(user_id, self.codec.encode(content))
+            extension = ".bin"
+        else:
+            entry = (json.dumps({"user_id": user_id, "content": content}, separators=(",", ":")) + "\n").encode("utf-8")
+            extension = ".jsonl"
+        segments = self.segments()
+        number = int(os.path.basename(segments[-1])[8:14]) if segments else 1
+        if segments and (os.path.getsize(segments[-1]) >= self.segment_bytes
+                         or not segments[-1].endswith(extension)):
+            number += 1
+        
+        with open(self._segment_path(number, extension), "ab") as f:
+            offset = f.tell()
+            f.write(entry)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        
+        key = _user_key(user_id)
+        record = _INDEX_RECORD.pack(key, _date_number(content.get("date")), number, offset, len(entry))
+        with open(self._partition_path(key), "ab") as f:
+            # Drop any torn record left by a writer that crashed mid-append
+            size = f.tell()
+            if size % _INDEX_RECORD.size:
+                f.truncate(size - size % _INDEX_RECORD.size)
+            f.write(record)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+    
+    def _user_records(self, key: bytes) -> Iterator[Tuple[int, int, int, int]]:
+        """(date, segment, offset, length) of every index record under one user key, in save order"""
+        path = self._legacy_index_path
+        if not os.path.exists(path):
+            path = self._partition_path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+        size = _INDEX_RECORD.size
+        usable = len(data) - len(data) % size
+        # bytes.find does the scanning; keys only count at record boundaries
+        pos = data.find(key, 0, usable)
+        while pos != -1:
+            if pos % size:
+                pos = data.find(key, pos + 1, usable)
+                continue
+            yield _INDEX_RECORD.unpack_from(data, pos)[1:]
+            pos = data.find(key, pos + size, usable)
+    
+    def load_user_history(self, user_id: str, since: Optional[str] = None) -> List[Dict]:
+        """
+        Return a user's saved content entries, oldest first
+        
+        Parameters:
+        -----------
+        user_id : str
+            Unique identifier for the user
+        since : str
+            Only return entries dated on or after this YYYY-MM-DD date
+        
+        Returns:
+        --------
+        List[Dict]
+            The saved content dictionaries
+        """
+        history = []
+        for _, content in self._entries(user_id, since):
+            if isinstance(content, DailyRecord):
+                content = self.codec.decode(content)
+            history.append(content)
+        return history
+    
+    def load_user_records(self, user_id: str, since: Optional[str] = None) -> List[DailyRecord]:
+        """
+        Like load_user_history, but as compact DailyRecords
+        
+        Needs a codec; JSONL entries are encoded on the way out.
+        """
+        codec = self.codec
+        if codec is None:
+            raise ValueError(f"{self.path} has no saved tables; open it with a codec first")
+        return [content if isinstance(content, DailyRecord) else codec.encode(content)
+                for _, content in self._entries(user_id, since)]
+    
+    def _entries(self, user_id: str, since: Optional[str]) -> Iterator[Tuple[str, object]]:
+        """A user's stored entries as (user_id, dict or DailyRecord), oldest first"""
+        first = _date_number(since) if since else 0
+        handles = {}
+        try:
+            for date, segment, offset, length in self._user_records(_user_key(user_id)):
+                if date < first:
+                    continue
+                entry_user, content = self._read_entry(handles, segment, offset, length)
+                # Guard against the (astronomically unlikely) 128-bit key collision
+                if entry_user == user_id:
+                    yield entry_user, content
+        finally:
+            for f in handles.values():
+                f.close()
+    
+    def _read_entry(self, handles: Dict, segment: int, offset: int, length: int) -> Tuple[str, object]:
+        f = handles.get(segment)
+        if f is None:
+            f = handles[segment] = open(self._segment_path(segment), "rb")
+        f.seek(offset)
+        data = f.read(length)
+        if f.name.endswith(".bin"):
+            return self.codec.unpack(data)
+        record = json.loads(data)
+        return record["user_id"], record["content"]
+    
+    def scan(self, chunk_size: int = 65536, since: Optional[str] = None) -> Iterator[List[Tuple[str, object]]]:
+        """
+        Stream every stored entry, in chunks
+        
+        Reads the index one partition at a time, ``chunk_size`` records at a
+        time, and keeps at most one segment open, so memory stays bounded
+        however large the store is. Entries come grouped by index partition,
+        each user's oldest first, as (user_id, dict or DailyRecord) pairs.
+        
+        Parameters:
+        -----------
+        chunk_size : int
+            Entries per yielded chunk
+        since : str
+            Skip entries dated before this YYYY-MM-DD date
+        
+        Returns:
+        --------
+        Iterator[List[Tuple[str, object]]]
+            Lists of up to chunk_size (user_id, entry) pairs
+        """
+        first = _date_number(since) if since else 0
+        handles = {}
+        chunk = []
+        try:
+            for path in self._index_files():
+                with open(path, "rb") as index:
+                    while True:
+                        data = index.read(chunk_size * _INDEX_RECORD.size)
+                        usable = len(data) - len(data) % _INDEX_RECORD.size
+                        if not usable:
+                            break
+                        for _, date, segment, offset, length in _INDEX_RECORD.iter_unpack(data[:usable]):
+                            if date < first:
+                                continue
+                            if segment not in handles:
+                                # A partition lists segments in order, so earlier ones are done with
+                                for f in handles.values():
+                                    f.close()
+                                handles.clear()
+                            chunk.append(self._read_entry(handles, segment, offset, length))
+                            if len(chunk) >= chunk_size:
+                                yield chunk
+                                chunk = []
+            if chunk:
+                yield chunk
+        finally:
+            for f in handles.values():
+                f.close()
+    
+    def migrate_json(self, json_path: str) -> int:
+        """
+        One-time import of the old whole-file JSON layout
+        
+        Entries from ``{"users": {user_id: {"history": [...]}}}`` are appended
+        and the file ends up renamed to ``<json_path>.migrated``. The whole
+        import holds the store lock, so concurrent processes import the file
+        once. It is renamed to ``<json_path>.migrating`` before anything is
+        appended, with the store's file sizes recorded in migration.json; an
+        interrupted import is rolled back to those sizes by the next append
+        or migration, and the next migration starts it over. A file that
+        isn't valid JSON is renamed to ``<json_path>.corrupt`` and skipped.
+        
+        Returns:
+        --------
+        int
+            Number of entries imported (0 if there was nothing left to import)
+        """
+        if self.readonly:
+            raise PermissionError(f"{self.path} was opened read-only")
+        staged = json_path + ".migrating"
+        with self._locked():
+            self._recover_migration()
+            if os.path.exists(json_path):
+                os.replace(json_path, staged)
+            elif not os.path.exists(staged):
+                return 0
+            
+            try:
+                with open(staged, "r") as f:
+                    users = json.load(f).get("users", {})
+                if not isinstance(users, dict):
+                    raise ValueError("'users' is not an object")
+            except (ValueError, AttributeError) as e:
+                corrupt = json_path + ".corrupt"
+                os.replace(staged, corrupt)
+                print(f"Could not read {json_path} ({e}); moved it to {corrupt}")
+                return 0
+            
+            marker = {
+                "source": os.path.abspath(staged),
+                "segments": {os.path.basename(p): os.path.getsize(p) for p in self.segments()},
+                "index": {n: os.path.getsize(os.path.join(self._index_dir, n)) for n in os.listdir(self._index_dir)},
+            }
+            tmp = f"{self._migration_path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(marker, f)
+            os.replace(tmp, self._migration_path)
+            
+            count = 0
+            for user_id, user in users.items():
+                for content in user.get("history", []):
+                    self._append_locked(user_id, content)
+                    count += 1
+            # Renamed before the marker goes, so a crash in between reads as finished
+            os.replace(staged, json_path + ".migrated")
+            os.remove(self._migration_path)
+        return count
+    
+    def _recover_migration(self):
+        """Roll back a legacy import that was interrupted (caller holds the lock)"""
+        if not os.path.exists(self._migration_path):
+            return
+        with open(self._migration_path) as f:
+            marker = json.load(f)
+        if os.path.exists(marker["source"]):
+            for directory, paths, sizes in ((self.path, self.segments(), marker["segments"]),
+                                            (self._index_dir, os.listdir(self._index_dir), marker["index"])):
+                for path in paths:
+                    name = os.path.basename(path)
+                    if name in sizes:
+                        os.truncate(os.path.join(directory, name), sizes[name])
+                    else:
+                        os.remove(os.path.join(directory, name))
+            self._segment_files.clear()
+        os.remove(self._migration_path)
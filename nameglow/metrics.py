@@ -0,0 +1,154 @@
+"""Optional instrumentation: stage timings, counters and pluggable hooks"""
+import contextlib
+import json
+import threading
+import time
+from typing import Callable, Dict, List
+
+# Shared no-op context for disabled instrumentation, so a disabled stage
+# costs one attribute check and an empty with-block
+_NOOP = contextlib.nullcontext()
+
+
+class _Summary:
+    """Running count/total/min/max of one series of observations"""
+    
+    __slots__ = ("count", "total", "min", "max")
+    
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+    
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+    
+    def as_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "min": self.min if self.count else 0.0,
+            "max": self.max if self.count else 0.0,
+        }
+
+
+class MetricsRegistry:
+    """
+    Collects counters and timings from an instrumented NameGlow
+    
+    Timings (stage wall time, API latency) are summarized in milliseconds
+    under ``timings_ms``; event counts (cache hits, API errors, candidates
+    examined) accumulate under ``counters``. Hooks registered with
+    add_hook see every observation as it happens, e.g. to forward them to
+    an external metrics system. Safe to share between threads.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timings: Dict[str, _Summary] = {}
+        self._counters: Dict[str, int] = {}
+        self._hooks: List[Callable[[str, str, float], None]] = []
+        self.started = time.time()
+    
+    def add_hook(self, hook: Callable[[str, str, float], None]):
+        """Call ``hook(kind, name, value)`` for every observation; kind is "timing" or "counter\""""
+        self._hooks.append(hook)
+    
+    def remove_hook(self, hook: Callable[[str, str, float], None]):
+        self._hooks.remove(hook)
+    
+    def observe(self, name: str, ms: float):
+        """Record one timing in milliseconds"""
+        with self._lock:
+            summary = self._timings.get(name)
+            if summary is None:
+                summary = self._timings[name] = _Summary()
+            summary.add(ms)
+        for hook in self._hooks:
+            hook("timing", name, ms)
+    
+    def count(self, name: str, n: int = 1):
+        """Add ``n`` to a counter"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+        for hook in self._hooks:
+            hook("counter", name, n)
+    
+    @contextlib.contextmanager
+    def timer(self, name: str):
+        """Time the with-block, recording it even if it raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - start) * 1000)
+    
+    def reset(self):
+        with self._lock:
+            self._timings.clear()
+            self._counters.clear()
+            self.started = time.time()
+    
+    def snapshot(self, reset: bool = False) -> Dict:
+        """Copy of everything recorded so far, optionally clearing it in the same step"""
+        with self._lock:
+            snapshot = {
+                "started": self.started,
+                "taken": time.time(),
+                "timings_ms": {name: s.as_dict() for name, s in sorted(self._timings.items())},
+                "counters": dict(sorted(self._counters.items())),
+            }
+            if reset:
+                self._timings.clear()
+                self._counters.clear()
+                self.started = snapshot["taken"]
+            return snapshot
+    
+    def merge(self, snapshot: Dict):
+        """
+        Add another registry's snapshot, e.g. one returned by a worker process
+        
+        Hooks aren't called for merged values; they only see observations
+        made in this process.
+        """
+        with self._lock:
+            for name, other in snapshot["timings_ms"].items():
+                if not other["count"]:
+                    continue
+                summary = self._timings.get(name)
+                if summary is None:
+                    summary = self._timings[name] = _Summary()
+                summary.count += other["count"]
+                summary.total += other["total"]
+                summary.min = min(summary.min, other["min"])
+                summary.max = max(summary.max, other["max"])
+            for name, n in snapshot["counters"].items():
+                self._counters[name] = self._counters.get(name, 0) + n
+    
+    def to_text(self) -> str:
+        """Human-readable table of the current snapshot"""
+        snapshot = self.snapshot()
+        lines = [f"{'timing':32s} {'count':>8s} {'mean ms':>10s} {'min ms':>10s} {'max ms':>10s} {'total ms':>12s}"]
+        for name, s in snapshot["timings_ms"].items():
+            lines.append(f"{name:32s} {s['count']:8d} {s['mean']:10.3f} {s['min']:10.3f} "
+                         f"{s['max']:10.3f} {s['total']:12.1f}")
+        lines.append("")
+        lines.append(f"{'counter':32s} {'value':>8s}")
+        for name, value in snapshot["counters"].items():
+            lines.append(f"{name:32s} {value:8d}")
+        return "\n".join(lines)
+    
+    def export(self, path: str):
+        """Write a snapshot to ``path``: JSON for .json files, the text table otherwise"""
+        with open(path, "w") as f:
+            if path.endswith(".json"):
+                json.dump(self.snapshot(), f, indent=2)
+            else:
+                f.write(self.to_text() + "\n")
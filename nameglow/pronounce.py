@@ -0,0 +1,166 @@
+"""Letter bigram model and branch-and-bound pronounceable anagram search (needs numpy)"""
+import heapq
+from typing import List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from .anagrams import SearchBudget
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# A (27, 27) float32 array of log P(next | previous) over the letters a-z plus
+# a word-boundary token, so table[BOUNDARY, c] scores starting with c and
+# table[c, BOUNDARY] scores ending with it.
+BOUNDARY = 26
+_SAMPLE_WORDS = """
+about above across after again against almost along also always among animal
+another answer around asked began begin being believe below best better between
+black body book both bring brother built called came cannot careful carry center
+certain change children city close color come common complete could country
+course cover cried dance dark daughter decided deep different direction does done
+door down draw dream during early earth easy eight enough even evening ever every
+example face family father feel fire first follow food force form forward found
+free friend from garden gather gentle girl give golden good great green ground
+group grow half happen happy hard heard heart heavy help here high himself hold
+home hope horse hour house human hundred idea important inside island just keep
+kind know land language large later laugh learn leave letter life light listen
+little live long look made make many mark matter mean measure might mind minute
+money moon morning mother mountain move music name nation near never night noble
+nothing notice number ocean open order other over paper party people perhaps
+person picture piece place plain plant play point power present problem question
+quiet rain reach ready reason remember rest river road rock room round rule safe
+said same season second see seem sentence serene several shape short should
+show side silver simple since sing sister small smile snow soft some song soon
+sound south space speak special spirit spring stand star start stay still stone
+story strong study summer sunny surface table take talk teach tell thank there
+thing think those thought through today together told tomorrow toward travel tree
+true turn under until upon usual valley very voice wait walk warm watch water
+weather welcome went west where while white whole wide wild window winter wise
+wonder word work world write year yellow young
+"""
+
+
+def train_bigram_model(words: Sequence[str], smoothing: float = 0.1) -> "np.ndarray":
+    """
+    Estimate a letter bigram table from a list of words
+    
+    Parameters:
+    -----------
+    words : Sequence[str]
+        Training words; characters outside a-z are ignored
+    smoothing : float
+        Additive smoothing so unseen bigrams stay possible but unlikely
+        
+    Returns:
+    --------
+    np.ndarray
+        (27, 27) float32 array of log transition probabilities
+    """
+    import numpy as np
+    counts = np.full((27, 27), smoothing, dtype=np.float64)
+    for word in words:
+        tokens = [BOUNDARY] + [ord(c) - 97 for c in word.lower() if 'a' <= c <= 'z'] + [BOUNDARY]
+        if len(tokens) > 2:
+            np.add.at(counts, (tokens[:-1], tokens[1:]), 1)
+    return np.log(counts / counts.sum(axis=1, keepdims=True)).astype(np.float32)
+
+
+def pronounceable_anagrams(letters: str, table: "np.ndarray", k: int = 5,
+                           exclude: Sequence[str] = (),
+                           budget: Optional[SearchBudget] = None) -> List[str]:
+    """
+    Find the k anagrams of ``letters`` that score highest under a bigram table
+    
+    Branch and bound over distinct letter choices: each prefix is scored so
+    far, and the remaining letters are bounded by giving each one its best
+    incoming transition from another remaining letter, except that the next
+    letter must follow the current one, plus the best word ending. Source
+    letters are ranked per letter once up front, so a node's bound is one
+    pure-Python pass over the remaining distinct letters. A prefix is
+    dropped as soon as that optimistic total cannot beat the current k-th
+    best anagram.
+    
+    Parameters:
+    -----------
+    letters : str
+        Lowercase letters a-z to rearrange; anything else raises ValueError
+        rather than being dropped from the results
+    table : np.ndarray
+        Log-probability table from train_bigram_model
+    k : int
+        Number of anagrams to return
+    exclude : Sequence[str]
+        Anagrams to skip, such as the original name
+    budget : SearchBudget
+        Optional work limit, ticked once per search node
+        
+    Returns:
+    --------
+    List[str]
+        Anagrams, most pronounceable first
+    """
+    if any(not 'a' <= c <= 'z' for c in letters):
+        raise ValueError(f"pronounceable_anagrams only rearranges a-z, got {letters!r}")
+    if not letters or k <= 0:
+        return []
+    excluded = set(exclude)
+    remaining = [0] * 26
+    for c in letters:
+        remaining[ord(c) - 97] += 1
+    n = len(letters)
+    scores = table.tolist()  # plain floats: numpy scalar indexing would dominate each node
+    present = [c for c in range(26) if remaining[c]]
+    # For each letter, the name's letters ordered by how well they lead into
+    # it; fixed for the whole search, so a node's bound only has to skip
+    # sources that are used up
+    sources = {c: sorted(present, key=lambda s: -scores[s][c]) for c in present}
+    best: List[Tuple[float, str]] = []  # min-heap of the current top k
+    prefix: List[str] = []
+    
+    def bound(last: int) -> float:
+        total = 0.0
+        from_last = end = float("-inf")
+        for c in present:
+            count = remaining[c]
+            if not count:
+                continue
+            # Best transition into c from a remaining letter (itself only if
+            # another copy is left); the next letter must follow ``last``
+            into = 0.0
+            for s in sources[c]:
+                if remaining[s] > (s == c):
+                    into = scores[s][c]
+                    break
+            total += into * count
+            from_last = max(from_last, scores[last][c] - into)
+            end = max(end, scores[c][BOUNDARY])
+        return total + from_last + end
+    
+    def search(last: int, score: float) -> bool:
+        if budget is not None and not budget.tick():
+            return True
+        if len(prefix) == n:
+            word = ''.join(prefix)
+            total = score + scores[last][BOUNDARY]
+            if word not in excluded:
+                if len(best) < k:
+                    heapq.heappush(best, (total, word))
+                elif total > best[0][0]:
+                    heapq.heapreplace(best, (total, word))
+            return False
+        if len(best) == k and score + bound(last) <= best[0][0]:
+            return False
+        
+        # Try the likeliest next letters first so good anagrams fill the heap early
+        row = scores[last]
+        for c in sorted((c for c in present if remaining[c]), key=lambda c: -row[c]):
+            remaining[c] -= 1
+            prefix.append(chr(97 + c))
+            stop = search(c, score + row[c])
+            prefix.pop()
+            remaining[c] += 1
+            if stop:
+                return True
+        return False
+    
+    search(BOUNDARY, 0.0)
+    return [word for _, word in sorted(best, reverse=True)]
@@ -0,0 +1,142 @@
+"""Async chat-completion clients for the API-backed paths (needs aiohttp)"""
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+
+class LLMProvider(ABC):
+    """
+    Chat-completion client for one provider, bound to one event loop
+    
+    Requests share a single aiohttp session, so TCP/TLS connections are
+    pooled and reused, and a semaphore caps how many are in flight at once.
+    """
+    default_base_url = ""
+    default_model = ""
+    endpoint = ""
+    
+    def __init__(self, api_key: str, model: Optional[str] = None, base_url: Optional[str] = None,
+                 max_concurrency: int = 8, timeout: float = 30.0):
+        self.api_key = api_key
+        self.model = model or self.default_model
+        self.base_url = (base_url or self.default_base_url).rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._session = None
+    
+    @abstractmethod
+    def _headers(self) -> Dict[str, str]:
+        """Authentication and version headers sent with every request"""
+    
+    @abstractmethod
+    def _payload(self, system: str, prompt: str, max_tokens: int) -> Dict:
+        """JSON request body for one system + user message exchange"""
+    
+    @abstractmethod
+    def _parse(self, data: Dict) -> str:
+        """Reply text from a decoded JSON response"""
+    
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            import aiohttp
+            self._session = aiohttp.ClientSession(
+                headers=self._headers(),
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+    
+    async def complete(self, system: str, prompt: str, max_tokens: int = 256) -> str:
+        """
+        Send one system + user message exchange and return the reply text
+        
+        ``timeout`` starts once a concurrency slot is free, so time spent
+        queueing behind this client's own requests never counts as a
+        provider timeout.
+        """
+        session = self._get_session()
+        async with self._semaphore:
+            data = await asyncio.wait_for(self._post(session, self._payload(system, prompt, max_tokens)),
+                                          self.timeout)
+        return self._parse(data)
+    
+    async def _post(self, session, payload: Dict) -> Dict:
+        async with session.post(self.base_url + self.endpoint, json=payload) as response:
+            response.raise_for_status()
+            return await response.json()
+    
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class OpenAIProvider(LLMProvider):
+    default_base_url = "https://api.openai.com/v1"
+    default_model = "gpt-4"
+    endpoint = "/chat/completions"
+    
+    def _headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.api_key}"}
+    
+    def _payload(self, system: str, prompt: str, max_tokens: int) -> Dict:
+        return {
+            "model": self.model,
+            "max_tokens": max_tokens,
+            "messages": [
+                {"role": "system", "content": system},
+                {"role": "user", "content": prompt},
+            ],
+        }
+    
+    def _parse(self, data: Dict) -> str:
+        return data["choices"][0]["message"]["content"]
+
+
+class AnthropicProvider(LLMProvider):
+    default_base_url = "https://api.anthropic.com/v1"
+    default_model = "claude-3-opus-20240229"
+    endpoint = "/messages"
+    
+    def _headers(self) -> Dict[str, str]:
+        return {"x-api-key": self.api_key, "anthropic-version": "2023-06-01"}
+    
+    def _payload(self, system: str, prompt: str, max_tokens: int) -> Dict:
+        return {
+            "model": self.model,
+            "max_tokens": max_tokens,
+            "system": system,
+            "messages": [{"role": "user", "content": prompt}],
+        }
+    
+    def _parse(self, data: Dict) -> str:
+        return data["content"][0]["text"]
+
+
+PROVIDERS = {"openai": OpenAIProvider, "anthropic": AnthropicProvider}
+
+
+def make_provider(api_type: str, api_key: str, **options) -> LLMProvider:
+    """Create the provider for an api_type ('openai' or 'anthropic')"""
+    if api_type not in PROVIDERS:
+        raise ValueError(f"Unknown api_type {api_type!r}; expected one of {sorted(PROVIDERS)}")
+    return PROVIDERS[api_type](api_key, **options)
+
+
+class _BackgroundLoop:
+    """Event loop on a daemon thread, so sync methods can await providers from anywhere (even inside Jupyter)"""
+    
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="nameglow-api", daemon=True)
+        self._thread.start()
+    
+    def run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+    
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
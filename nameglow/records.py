@@ -0,0 +1,366 @@
+"""Compact in-memory and binary forms of generate_daily_content results"""
+import json
+import struct
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+# Standard content keys, in the order generate_daily_content produces them;
+# bit i of DailyRecord.present says whether key i was in the original dict
+CONTENT_KEYS = ("date", "name", "anagram", "virtue", "nicknames", "reflection_prompt",
+                "alternative_anagrams", "search_truncated")
+
+NICKNAME_KINDS = ("diminutive", "syllable", "prefix", "suffix")
+_PATTERN_TABLES = {"diminutive": "diminutives", "prefix": "prefix_patterns", "suffix": "suffix_patterns"}
+_SYLLABLE_PATTERN = "ie"
+_MEANING_PREFIXES = (("Represents the essence of ", "diminutive"), ("Captures the playful energy of ", "syllable"),
+                     ("Highlights the ", "prefix"), ("Celebrates the ", "suffix"))
+
+# Table references are one byte; this value means literal text follows
+_LITERAL = 0xFF
+_FLAG_TRUNCATED = 1
+_FLAG_DATE_TEXT = 2
+_FLAG_EXTRA = 4
+_U32 = struct.Struct("<I")
+
+
+def rule_nickname(kind: str, pattern: str, name: str) -> Dict:
+    """The nickname and meaning one rule-based pattern makes from a name"""
+    name = name.lower()
+    if kind == "diminutive":
+        return {"nickname": (name[0] + pattern).capitalize(),
+                "meaning": f"Represents the essence of {name.capitalize()}'s spirit"}
+    if kind == "syllable":
+        return {"nickname": (name[:3] + pattern).capitalize(),
+                "meaning": f"Captures the playful energy of {name.capitalize()}"}
+    if kind == "prefix":
+        return {"nickname": pattern + name[:3],
+                "meaning": f"Highlights the {pattern.lower()} nature within {name.capitalize()}"}
+    if kind == "suffix":
+        return {"nickname": (name + pattern).capitalize(),
+                "meaning": f"Celebrates the {pattern} that {name.capitalize()} brings to others"}
+    raise ValueError(f"Unknown nickname kind {kind!r}")
+
+
+class DailyRecord:
+    """
+    One content entry with table text replaced by small integers
+    
+    ``virtue`` and ``reflection`` are indexes into the codec's tables, and
+    each of ``nicknames`` is a pattern code, so none of that text is held
+    per entry. Any of them is kept as text instead when it isn't one the
+    tables can reproduce (e.g. an API-generated virtue). Keys the dict had
+    beyond the standard ones, or with non-standard values, go in ``extra``.
+    """
+    
+    __slots__ = ("present", "date", "name", "anagram", "virtue", "nicknames", "reflection",
+                 "alternatives", "truncated", "extra")
+    
+    def __init__(self, present: int, date: Union[int, str, None], name: Optional[str],
+                 anagram: Optional[str], virtue: Union[int, str, None],
+                 nicknames: Tuple[Union[int, Tuple[str, str]], ...], reflection: Union[int, str, None],
+                 alternatives: Tuple[str, ...], truncated: bool, extra: Optional[Dict] = None):
+        self.present = present
+        self.date = date
+        self.name = name
+        self.anagram = anagram
+        self.virtue = virtue
+        self.nicknames = nicknames
+        self.reflection = reflection
+        self.alternatives = alternatives
+        self.truncated = truncated
+        self.extra = extra
+    
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, DailyRecord):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+    
+    def __repr__(self) -> str:
+        return f"DailyRecord(name={self.name!r}, date={self.date!r}, anagram={self.anagram!r})"
+
+
+class RecordCodec:
+    """
+    Converts content dicts to DailyRecords and DailyRecords to bytes
+    
+    Built from the virtue, reflection prompt and nickname pattern tables on
+    NameGlow. Decoding needs the same tables that encoding used, so stores
+    keep a copy of them (see tables()) next to the encoded data.
+    """
+    
+    def __init__(self, virtues: Sequence[str], reflection_prompts: Sequence[str],
+                 nickname_patterns: Dict[str, Sequence[str]]):
+        self.virtues = list(virtues)
+        self.reflection_prompts = list(reflection_prompts)
+        self.nickname_patterns = {key: list(values) for key, values in nickname_patterns.items()}
+        self._virtue_index = {v: i for i, v in enumerate(self.virtues[:_LITERAL])}
+        self._prompt_index = {p: i for i, p in enumerate(self.reflection_prompts[:_LITERAL])}
+        # Nickname code = kind * 64 + pattern index
+        self._patterns: Dict[int, Tuple[str, str]] = {}
+        for kind_index, kind in enumerate(NICKNAME_KINDS):
+            if kind == "syllable":
+                patterns = [_SYLLABLE_PATTERN]
+            else:
+                patterns = self.nickname_patterns.get(_PATTERN_TABLES[kind], [])
+            for pattern_index, pattern in enumerate(patterns[:64]):
+                code = kind_index * 64 + pattern_index
+                if code < _LITERAL:
+                    self._patterns[code] = (kind, pattern)
+        self._patterns_by_kind = {kind: [(code, pattern) for code, (k, pattern) in self._patterns.items() if k == kind]
+                                  for kind in NICKNAME_KINDS}
+    
+    @classmethod
+    def from_nameglow(cls, nameglow) -> "RecordCodec":
+        return cls(nameglow.virtues, nameglow.reflection_prompts, nameglow.nickname_patterns)
+    
+    def tables(self) -> Dict:
+        """The tables this codec encodes against, as JSON-ready data"""
+        return {"virtues": self.virtues, "reflection_prompts": self.reflection_prompts,
+                "nickname_patterns": self.nickname_patterns}
+    
+    @classmethod
+    def from_tables(cls, tables: Dict) -> "RecordCodec":
+        return cls(tables["virtues"], tables["reflection_prompts"], tables["nickname_patterns"])
+    
+    def encode(self, content: Dict) -> DailyRecord:
+        """Convert a content dict to a DailyRecord; decode() gives back an equal dict"""
+        extra = {key: value for key, value in content.items() if key not in CONTENT_KEYS}
+        present = 0
+        values = {}
+        for bit, key in enumerate(CONTENT_KEYS):
+            if key not in content:
+                continue
+            if _valid(key, content[key]):
+                present |= 1 << bit
+                values[key] = content[key]
+            else:
+                extra[key] = content[key]
+        
+        name = values.get("name")
+        nicknames = tuple(self._nickname_code(n, name) for n in values.get("nicknames", ()))
+        return DailyRecord(
+            present,
+            _encode_date(values["date"]) if "date" in values else None,
+            name,
+            values.get("anagram"),
+            self._virtue_index.get(values["virtue"], values["virtue"]) if "virtue" in values else None,
+            nicknames,
+            self._prompt_index.get(values["reflection_prompt"], values["reflection_prompt"])
+            if "reflection_prompt" in values else None,
+            tuple(values.get("alternative_anagrams", ())),
+            values.get("search_truncated", False),
+            extra or None,
+        )
+    
+    def _nickname_code(self, nickname: Dict, name: Optional[str]) -> Union[int, Tuple[str, str]]:
+        # The meaning's opening words identify the kind, so only that kind's
+        # patterns need rebuilding and comparing
+        kind = next((k for prefix, k in _MEANING_PREFIXES if nickname["meaning"].startswith(prefix)), None)
+        if name and kind is not None:
+            for code, pattern in self._patterns_by_kind[kind]:
+                if rule_nickname(kind, pattern, name) == nickname:
+                    return code
+        return (nickname["nickname"], nickname["meaning"])
+    
+    def nickname_pattern(self, code: int) -> Tuple[str, str]:
+        """The (kind, pattern) a nickname code stands for, e.g. ("suffix", "heart")"""
+        return self._patterns[code]
+    
+    def decode(self, record: DailyRecord) -> Dict:
+        """Rebuild the content dict a DailyRecord was encoded from"""
+        content = {}
+        for bit, key in enumerate(CONTENT_KEYS):
+            if not record.present >> bit & 1:
+                continue
+            if key == "date":
+                content[key] = _decode_date(record.date)
+            elif key == "name":
+                content[key] = record.name
+            elif key == "anagram":
+                content[key] = record.anagram
+            elif key == "virtue":
+                content[key] = record.virtue if isinstance(record.virtue, str) else self.virtues[record.virtue]
+            elif key == "nicknames":
+                content[key] = [
+                    {"nickname": n[0], "meaning": n[1]} if isinstance(n, tuple)
+                    else rule_nickname(*self._patterns[n], record.name)
+                    for n in record.nicknames
+                ]
+            elif key == "reflection_prompt":
+                content[key] = record.reflection if isinstance(record.reflection, str) \
+                    else self.reflection_prompts[record.reflection]
+            elif key == "alternative_anagrams":
+                content[key] = list(record.alternatives)
+            else:
+                content[key] = record.truncated
+        if record.extra:
+            content.update(record.extra)
+        return content
+    
+    def pack(self, user_id: str, record: DailyRecord) -> bytes:
+        """
+        Dense binary form of one history entry
+        
+        Layout: user_id, present mask u8, flags u8, date (YYYYMMDD u32 or
+        text), then each present field in CONTENT_KEYS order. Strings are
+        varint-length-prefixed UTF-8; table references are one byte, 0xFF
+        meaning literal text follows.
+        """
+        out = bytearray()
+        _put_str(out, user_id)
+        flags = (_FLAG_TRUNCATED if record.truncated else 0) | \
+                (_FLAG_DATE_TEXT if isinstance(record.date, str) else 0) | \
+                (_FLAG_EXTRA if record.extra else 0)
+        out.append(record.present)
+        out.append(flags)
+        present = record.present
+        if present & 1:
+            if isinstance(record.date, str):
+                _put_str(out, record.date)
+            else:
+                out += _U32.pack(record.date)
+        if present & 2:
+            _put_str(out, record.name)
+        if present & 4:
+            _put_str(out, record.anagram)
+        if present & 8:
+            _put_ref(out, record.virtue)
+        if present & 16:
+            out.append(len(record.nicknames))
+            for nickname in record.nicknames:
+                if isinstance(nickname, tuple):
+                    out.append(_LITERAL)
+                    _put_str(out, nickname[0])
+                    _put_str(out, nickname[1])
+                else:
+                    out.append(nickname)
+        if present & 32:
+            _put_ref(out, record.reflection)
+        if present & 64:
+            _put_varint(out, len(record.alternatives))
+            for anagram in record.alternatives:
+                _put_str(out, anagram)
+        if record.extra:
+            _put_str(out, json.dumps(record.extra, separators=(",", ":")))
+        return bytes(out)
+    
+    def unpack(self, data: bytes) -> Tuple[str, DailyRecord]:
+        """Inverse of pack: the user_id and DailyRecord"""
+        user_id, pos = _get_str(data, 0)
+        present, flags = data[pos], data[pos + 1]
+        pos += 2
+        date = name = anagram = virtue = reflection = None
+        nicknames: List[Union[int, Tuple[str, str]]] = []
+        alternatives: List[str] = []
+        if present & 1:
+            if flags & _FLAG_DATE_TEXT:
+                date, pos = _get_str(data, pos)
+            else:
+                date = _U32.unpack_from(data, pos)[0]
+                pos += _U32.size
+        if present & 2:
+            name, pos = _get_str(data, pos)
+        if present & 4:
+            anagram, pos = _get_str(data, pos)
+        if present & 8:
+            virtue, pos = _get_ref(data, pos)
+        if present & 16:
+            count = data[pos]
+            pos += 1
+            for _ in range(count):
+                code = data[pos]
+                pos += 1
+                if code == _LITERAL:
+                    nickname, pos = _get_str(data, pos)
+                    meaning, pos = _get_str(data, pos)
+                    nicknames.append((nickname, meaning))
+                else:
+                    nicknames.append(code)
+        if present & 32:
+            reflection, pos = _get_ref(data, pos)
+        if present & 64:
+            count, pos = _get_varint(data, pos)
+            for _ in range(count):
+                anagram_text, pos = _get_str(data, pos)
+                alternatives.append(anagram_text)
+        extra = None
+        if flags & _FLAG_EXTRA:
+            text, pos = _get_str(data, pos)
+            extra = json.loads(text)
+        # A user's name and anagrams repeat across their entries, so loaded
+        # histories share one copy of each
+        return user_id, DailyRecord(present, date, name and sys.intern(name),
+                                    anagram and sys.intern(anagram), virtue, tuple(nicknames), reflection,
+                                    tuple(sys.intern(a) for a in alternatives),
+                                    bool(flags & _FLAG_TRUNCATED), extra)
+
+
+def _valid(key: str, value) -> bool:
+    """Whether a standard key holds the type the compact form can store"""
+    if key == "nicknames":
+        return isinstance(value, list) and len(value) < _LITERAL and all(
+            isinstance(n, dict) and n.keys() == {"nickname", "meaning"}
+            and isinstance(n["nickname"], str) and isinstance(n["meaning"], str)
+            for n in value
+        )
+    if key == "alternative_anagrams":
+        return isinstance(value, list) and all(isinstance(a, str) for a in value)
+    if key == "search_truncated":
+        return isinstance(value, bool)
+    return isinstance(value, str)
+
+
+def _encode_date(date: str) -> Union[int, str]:
+    # YYYY-MM-DD packs into a u32; anything else is kept verbatim
+    if len(date) == 10 and date[4] == date[7] == "-" and (date[:4] + date[5:7] + date[8:]).isdigit():
+        return int(date[:4] + date[5:7] + date[8:])
+    return date
+
+
+def _decode_date(date: Union[int, str]) -> str:
+    if isinstance(date, str):
+        return date
+    return f"{date // 10000:04d}-{date // 100 % 100:02d}-{date % 100:02d}"
+
+
+def _put_varint(out: bytearray, value: int):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _get_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _put_str(out: bytearray, text: str):
+    encoded = text.encode("utf-8")
+    _put_varint(out, len(encoded))
+    out += encoded
+
+
+def _get_str(data: bytes, pos: int) -> Tuple[str, int]:
+    length, pos = _get_varint(data, pos)
+    return data[pos:pos + length].decode("utf-8"), pos + length
+
+
+def _put_ref(out: bytearray, value: Union[int, str]):
+    if isinstance(value, str):
+        out.append(_LITERAL)
+        _put_str(out, value)
+    else:
+        out.append(value)
+
+
+def _get_ref(data: bytes, pos: int) -> Tuple[Union[int, str], int]:
+    if data[pos] == _LITERAL:
+        return _get_str(data, pos + 1)
+    return data[pos], pos + 1
@@ -0,0 +1,168 @@
+"""HTML rendering of daily insight cards, for notebooks and bulk static export"""
+import html
+import os
+import re
+import string
+import time
+import zipfile
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+CARD_TEMPLATE = """
+        <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px; border-radius: 10px; background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);">
+            <h2 style="text-align: center; color: #4a6fa5;">NameGlow Daily Insight</h2>
+            <p style="text-align: center; color: #666;">For {name} on {date}</p>
+            
+            <div style="background-color: white; border-radius: 8px; padding: 15px; margin: 15px 0; box-shadow: 0 2px 10px rgba(0,0,0,0.05);">
+                <h3 style="color: #4a6fa5; margin-top: 0;">Your Anagram of the Day</h3>
+                <p style="font-size: 28px; text-align: center; margin: 10px 0; color: #2c3e50;">{anagram}</p>
+                <p style="text-align: center; font-style: italic; color: #7f8c8d;">Embodying the virtue of <strong>{virtue}</strong></p>
+            </div>
+            
+            <div style="background-color: white; border-radius: 8px; padding: 15px; margin: 15px 0; box-shadow: 0 2px 10px rgba(0,0,0,0.05);">
+                <h3 style="color: #4a6fa5; margin-top: 0;">Your Suggested Nicknames</h3>
+                <ul style="list-style-type: none; padding: 0;">
+        {nicknames}
+                </ul>
+            </div>
+            
+            <div style="background-color: white; border-radius: 8px; padding: 15px; margin: 15px 0; box-shadow: 0 2px 10px rgba(0,0,0,0.05);">
+                <h3 style="color: #4a6fa5; margin-top: 0;">Today's Reflection</h3>
+                <p style="color: #34495e; font-style: italic; text-align: center;">{reflection_prompt}</p>
+            </div>
+        </div>
+        """
+
+NICKNAME_TEMPLATE = """
+                    <li style="margin-bottom: 10px;">
+                        <div style="display: flex; justify-content: space-between; align-items: center;">
+                            <span style="font-size: 20px; color: #2c3e50;"><strong>{nickname}</strong></span>
+                            <span style="color: #7f8c8d; font-style: italic; font-size: 14px;">{meaning}</span>
+                        </div>
+                    </li>
+            """
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>NameGlow Daily Insight for {name} on {date}</title></head>
+<body>{card}</body>
+</html>
+"""
+
+
+class CompiledTemplate:
+    """
+    A ``{field}`` template parsed once into literal text and slot names
+    
+    Rendering is a single join over the pre-split parts, with no parsing
+    or intermediate string concatenation per card.
+    """
+    
+    def __init__(self, source: str):
+        self.parts: List[Tuple[str, Optional[str]]] = [
+            (literal, field) for literal, field, _, _ in string.Formatter().parse(source)
+        ]
+    
+    def render(self, values: Dict[str, str]) -> str:
+        """Fill the slots; values must already be escaped"""
+        out = []
+        for literal, field in self.parts:
+            out.append(literal)
+            if field is not None:
+                out.append(values[field])
+        return ''.join(out)
+
+
+class CardRenderer:
+    """Render generate_daily_content results as HTML cards"""
+    
+    def __init__(self, card_template: str = CARD_TEMPLATE, nickname_template: str = NICKNAME_TEMPLATE,
+                 page_template: str = PAGE_TEMPLATE):
+        self.card = CompiledTemplate(card_template)
+        self.nickname = CompiledTemplate(nickname_template)
+        self.page = CompiledTemplate(page_template)
+    
+    def render(self, content: Dict) -> str:
+        """Render one card as an HTML fragment, escaping all user data"""
+        escape = html.escape
+        nicknames = ''.join(
+            self.nickname.render({"nickname": escape(str(n["nickname"])), "meaning": escape(str(n["meaning"]))})
+            for n in content["nicknames"]
+        )
+        return self.card.render({
+            "name": escape(str(content["name"])),
+            "date": escape(str(content["date"])),
+            "anagram": escape(str(content["anagram"]).capitalize()),
+            "virtue": escape(str(content["virtue"])),
+            "nicknames": nicknames,
+            "reflection_prompt": escape(str(content["reflection_prompt"])),
+        })
+    
+    def render_page(self, content: Dict) -> str:
+        """Render one card as a standalone HTML document"""
+        return self.page.render({
+            "name": html.escape(str(content["name"])),
+            "date": html.escape(str(content["date"])),
+            "card": self.render(content),
+        })
+    
+    def render_many(self, contents: Iterable[Dict]) -> Iterator[str]:
+        """Lazily render a stream of results as standalone pages"""
+        for content in contents:
+            yield self.render_page(content)
+    
+    def export(self, contents: Iterable[Dict], path: str) -> Dict:
+        """
+        Write one standalone page per result, streaming as they arrive
+        
+        Only one card is held in memory at a time, so ``contents`` can be a
+        generator over a whole user base (e.g. generate_daily_content_batch).
+        
+        Parameters:
+        -----------
+        contents : Iterable[Dict]
+            generate_daily_content results
+        path : str
+            A directory for one file per card, or a path ending in .zip to
+            write a single compressed archive
+        
+        Returns:
+        --------
+        Dict
+            Number of cards written, elapsed seconds and cards per second
+        """
+        start = time.perf_counter()
+        count = 0
+        
+        if path.endswith(".zip"):
+            with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                for count, content in enumerate(contents, 1):
+                    archive.writestr(_card_filename(count, content), self.render_page(content))
+        else:
+            os.makedirs(path, exist_ok=True)
+            for count, content in enumerate(contents, 1):
+                with open(os.path.join(path, _card_filename(count, content)), "w", encoding="utf-8") as f:
+                    f.write(self.render_page(content))
+        
+        elapsed = time.perf_counter() - start
+        return {
+            "cards": count,
+            "seconds": elapsed,
+            "cards_per_second": count / elapsed if elapsed > 0 else 0.0,
+        }
+
+
+def _card_filename(number: int, content: Dict) -> str:
+    # Numbered so users who share a name never overwrite each other's card
+    slug = re.sub(r"[^a-z0-9]+", "-", str(content["name"]).lower()).strip("-") or "user"
+    return f"{number:06d}-{slug}-{content['date']}.html"
+
+
+_default_renderer: Optional[CardRenderer] = None
+
+
+def render_card(content: Dict) -> str:
+    """Render one card with a shared, already-compiled renderer"""
+    global _default_renderer
+    if _default_renderer is None:
+        _default_renderer = CardRenderer()
+    return _default_renderer.render(content)
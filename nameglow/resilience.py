@@ -0,0 +1,106 @@
+"""Retry and circuit-breaker policies for the API-backed paths"""
+import random
+import threading
+import time
+from typing import Optional
+
+
+class ProviderUnavailable(Exception):
+    """Raised instead of calling the provider while the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Stops calling a provider that keeps failing, then probes it again
+    
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    every call is refused for ``reset_timeout`` seconds. The first call
+    after that is let through as a probe (half-open): success closes the
+    breaker, failure opens it for another ``reset_timeout``. Safe to share
+    between threads and event loops.
+    """
+    
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+    
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+    
+    def _state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+    
+    def allow(self) -> bool:
+        """Whether a call may go to the provider now"""
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+    
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+    
+    def release(self):
+        """Give up a probe slot without a result (e.g. the call was cancelled)"""
+        with self._lock:
+            self._probing = False
+    
+    def record_failure(self) -> bool:
+        """Count a failure, returning True if it just opened the breaker"""
+        with self._lock:
+            self.failures += 1
+            was_open = self.opened_at is not None
+            # Only a failed probe restarts the open period; calls that were
+            # already in flight when it opened must not keep extending it
+            if self._probing or (not was_open and self.failures >= self.failure_threshold):
+                self.opened_at = time.monotonic()
+            self._probing = False
+            return not was_open and self.opened_at is not None
+
+
+class RetryPolicy:
+    """
+    Retry count and jittered exponential backoff between attempts
+    
+    Uses "full jitter": the wait before retry n is uniform in
+    [0, min(max_delay, base_delay * 2**n)], so clients that failed together
+    don't retry together.
+    """
+    
+    def __init__(self, retries: int = 2, base_delay: float = 0.2, max_delay: float = 2.0,
+                 rng: Optional[random.Random] = None):
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rng = rng or random.Random()
+    
+    def delay(self, retry: int) -> float:
+        """Seconds to wait before retry number ``retry`` (0-based)"""
+        return self.rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Timeouts, connection errors and 429/5xx responses are worth retrying; other 4xx are not"""
+    status = getattr(error, "status", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    return not isinstance(error, (ProviderUnavailable, ValueError, KeyError, TypeError))
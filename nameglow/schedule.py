@@ -0,0 +1,137 @@
+"""Precomputed per-user content schedules"""
+import datetime
+import json
+import struct
+from array import array
+from typing import List, Dict, Optional, Sequence
+
+# Per-day row: anagram, virtue, reflection prompt and nickname offset, each
+# an index into the matching pool stored once in the schedule header
+_ROW_WIDTH = 4
+_HEADER = struct.Struct("<4sII")
+SCHEDULE_MAGIC = b"NGSC"
+
+
+class ContentSchedule:
+    """
+    A user's content for a run of consecutive days
+    
+    Each piece of text (anagram, virtue, prompt, nickname) is stored once,
+    and each day is four small integers into those pools, so serving a day
+    is one array index with no anagram search or API call.
+    """
+    
+    def __init__(self, name: str, start_date: str, anagrams: Sequence[str],
+                 virtues: Sequence[str], prompts: Sequence[str], nicknames: Sequence[Dict],
+                 rows: array, search_truncated: bool = False):
+        self.name = name
+        self.start_date = start_date
+        self.anagrams = list(anagrams)
+        self.virtues = list(virtues)
+        self.prompts = list(prompts)
+        self.nicknames = list(nicknames)
+        self.rows = rows
+        self.search_truncated = search_truncated
+        self._start = datetime.date.fromisoformat(start_date).toordinal()
+    
+    @property
+    def days(self) -> int:
+        return len(self.rows) // _ROW_WIDTH
+    
+    def day_index(self, date: str) -> int:
+        """Offset of ``date`` from the start of the schedule"""
+        day = datetime.date.fromisoformat(date).toordinal() - self._start
+        if not 0 <= day < self.days:
+            raise KeyError(f"{date} is outside the schedule for {self.name} "
+                           f"({self.start_date} + {self.days} days)")
+        return day
+    
+    def row(self, day: int) -> Sequence[int]:
+        """The (anagram, virtue, prompt, nickname offset) indexes for a day"""
+        return self.rows[day * _ROW_WIDTH:(day + 1) * _ROW_WIDTH]
+    
+    def content_for(self, date: Optional[str] = None) -> Dict:
+        """
+        The day's content, in the same shape as generate_daily_content
+        
+        Parameters:
+        -----------
+        date : str
+            Date to serve (YYYY-MM-DD); today by default
+        
+        Returns:
+        --------
+        Dict
+            Dictionary with anagram, virtue, nicknames, and reflection prompt
+        """
+        date = date or datetime.date.today().isoformat()
+        anagram, virtue, prompt, nickname = self.row(self.day_index(date))
+        count = len(self.anagrams)
+        pool = self.nicknames
+        return {
+            "date": date,
+            "name": self.name,
+            "anagram": self.anagrams[anagram],
+            "virtue": self.virtues[virtue],
+            "nicknames": [pool[(nickname + i) % len(pool)] for i in range(min(2, len(pool)))],
+            "reflection_prompt": self.prompts[prompt],
+            # The anagrams coming up next in the rotation
+            "alternative_anagrams": [self.anagrams[(anagram + i) % count] for i in range(1, min(3, count))],
+            "search_truncated": self.search_truncated
+        }
+    
+    def to_bytes(self) -> bytes:
+        """Encode as a small JSON header for the pools followed by the packed rows"""
+        header = json.dumps({
+            "name": self.name,
+            "start_date": self.start_date,
+            "anagrams": self.anagrams,
+            "virtues": self.virtues,
+            "prompts": self.prompts,
+            "nicknames": self.nicknames,
+            "search_truncated": self.search_truncated,
+        }, separators=(",", ":")).encode("utf-8")
+        return _HEADER.pack(SCHEDULE_MAGIC, len(header), self.days) + header + self.rows.tobytes()
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ContentSchedule":
+        magic, header_len, days = _HEADER.unpack_from(data, 0)
+        if magic != SCHEDULE_MAGIC:
+            raise ValueError("Not a NameGlow content schedule")
+        header = json.loads(data[_HEADER.size:_HEADER.size + header_len])
+        rows = array("H")
+        rows.frombytes(data[_HEADER.size + header_len:])
+        if len(rows) != days * _ROW_WIDTH:
+            raise ValueError("Truncated NameGlow content schedule")
+        return cls(header["name"], header["start_date"], header["anagrams"], header["virtues"],
+                   header["prompts"], header["nicknames"], rows, header["search_truncated"])
+    
+    def save(self, path: str):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+    
+    @classmethod
+    def load(cls, path: str) -> "ContentSchedule":
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+def rotate_virtues(associated: Sequence[int], order: Sequence[int], days: int) -> List[int]:
+    """
+    Pick a virtue index per day without repeats inside each full cycle
+
+    Each day keeps the virtue associated with its anagram when that virtue
+    hasn't been used yet in the current cycle; otherwise it takes the next
+    unused virtue in ``order`` (a per-user shuffle of every virtue index).
+    """
+    picked = []
+    used = set()
+    for day in range(days):
+        if len(used) == len(order):
+            used.clear()
+        virtue = associated[day]
+        if virtue in used:
+            virtue = next(v for v in order if v not in used)
+        used.add(virtue)
+        picked.append(virtue)
+    return picked
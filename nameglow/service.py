@@ -0,0 +1,193 @@
+"""
+Local HTTP service for daily content (needs aiohttp)
+
+    python -m nameglow.service --port 8080
+
+    GET  /daily?name=Michael[&date=YYYY-MM-DD]
+    POST /batch  {"names": ["Michael", "Sophia"], "date": "YYYY-MM-DD"}
+    GET  /stats
+
+Content is stable for a user within a day, so responses are cached per
+(normalized name, date), and concurrent requests for the same key wait on
+the one computation already in flight instead of starting their own.
+"""
+import argparse
+import asyncio
+import datetime
+import functools
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+from .cache import SignatureCache
+from .core import NameGlow, _init_batch_worker, _run_batch_chunk
+from .metrics import MetricsRegistry
+
+
+def normalize_name(name: str) -> str:
+    """Cache key form of a name, matching the normalization in NameGlow.user_rng"""
+    return name.lower().replace(' ', '')
+
+
+class DailyContentService:
+    """
+    Cached, coalescing front end to NameGlow.generate_daily_content
+    
+    With ``workers`` set, each user's content is computed in a process pool
+    so anagram search never holds the event loop's GIL; otherwise the
+    search runs in the loop's default thread executor and API calls are
+    awaited on the loop (generate_daily_content_async).
+    """
+    
+    def __init__(self, nameglow: NameGlow, workers: Optional[int] = None, cache_size: int = 100_000,
+                 seed=None, time_budget_ms: Optional[float] = None, max_steps: Optional[int] = None,
+                 max_batch: int = 1000):
+        self.nameglow = nameglow
+        self.workers = workers
+        self.seed = seed
+        self.time_budget_ms = time_budget_ms
+        self.max_steps = max_steps
+        self.max_batch = max_batch
+        self._responses = SignatureCache(cache_size)
+        self._in_flight: Dict[tuple, asyncio.Task] = {}
+        self._executor = None
+        self.counters = {"requests": 0, "computed": 0, "coalesced": 0, "errors": 0}
+    
+    def _get_executor(self):
+        if self._executor is None and self.workers:
+            from concurrent.futures import ProcessPoolExecutor
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_batch_worker,
+                                                 initargs=(self.nameglow._config,
+                                                           self.nameglow.metrics is not None))
+        return self._executor
+    
+    async def daily_content(self, name: str, date: Optional[str] = None) -> Dict:
+        """Today's (or ``date``'s) content for one user, computed at most once per day"""
+        date = date or datetime.date.today().isoformat()
+        key = (normalize_name(name), date)
+        self.counters["requests"] += 1
+        
+        # Entries are shared by every spelling of the name, so each caller
+        # gets a copy carrying the name they asked for
+        cached = self._responses.get(key)
+        if cached is not None:
+            return {**cached, "name": name}
+        
+        task = self._in_flight.get(key)
+        if task is None:
+            # A task of its own, so a client disconnecting doesn't cancel
+            # the computation other requests are waiting on
+            task = asyncio.ensure_future(self._compute(name, date))
+            task.add_done_callback(functools.partial(self._finished, key))
+            self._in_flight[key] = task
+        else:
+            self.counters["coalesced"] += 1
+        return {**await asyncio.shield(task), "name": name}
+    
+    def _finished(self, key: tuple, task: asyncio.Task):
+        del self._in_flight[key]
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            self.counters["errors"] += 1
+        else:
+            self.counters["computed"] += 1
+            self._responses.put(key, task.result())
+    
+    async def _compute(self, name: str, date: str) -> Dict:
+        rng = NameGlow.user_rng(name, date, self.seed)
+        executor = self._get_executor()
+        if executor is None:
+            return await self.nameglow.generate_daily_content_async(
+                name, time_budget_ms=self.time_budget_ms, max_steps=self.max_steps, date=date, rng=rng)
+        
+        options = dict(date=date, seed=self.seed, time_budget_ms=self.time_budget_ms,
+                       max_steps=self.max_steps)
+        results = await asyncio.get_running_loop().run_in_executor(executor, _run_batch_chunk,
+                                                                   [name], options)
+        return self.nameglow._worker_results(results)[0]
+    
+    async def batch_content(self, names: List[str], date: Optional[str] = None) -> List[Dict]:
+        """Content for several users, in input order, sharing the per-user cache"""
+        date = date or datetime.date.today().isoformat()
+        return list(await asyncio.gather(*(self.daily_content(name, date) for name in names)))
+    
+    def stats(self) -> Dict:
+        stats = {**self.counters, "in_flight": len(self._in_flight),
+                 "response_cache": self._responses.stats(), **self.nameglow.cache_stats()}
+        if self.nameglow.metrics is not None:
+            stats["metrics"] = self.nameglow.metrics.snapshot()
+        return stats
+    
+    async def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        await self.nameglow.aclose()
+
+
+def _parse_date(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    try:
+        return datetime.date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise web.HTTPBadRequest(text=f"Invalid date {value!r}, expected YYYY-MM-DD")
+
+
+def make_app(service: DailyContentService) -> web.Application:
+    """Build the aiohttp application serving ``service``"""
+
+    async def daily(request: web.Request) -> web.Response:
+        name = request.query.get("name", "").strip()
+        if not name:
+            raise web.HTTPBadRequest(text="Missing 'name' query parameter")
+        date = _parse_date(request.query.get("date"))
+        return web.json_response(await service.daily_content(name, date))
+
+    async def batch(request: web.Request) -> web.Response:
+        try:
+            body = await request.json()
+        except ValueError:
+            raise web.HTTPBadRequest(text="Request body must be JSON")
+        names = body.get("names") if isinstance(body, dict) else None
+        if not isinstance(names, list) or not all(isinstance(n, str) and n.strip() for n in names):
+            raise web.HTTPBadRequest(text="'names' must be a list of non-empty strings")
+        if len(names) > service.max_batch:
+            raise web.HTTPRequestEntityTooLarge(max_size=service.max_batch, actual_size=len(names))
+        date = _parse_date(body.get("date"))
+        return web.json_response(await service.batch_content([n.strip() for n in names], date))
+
+    async def stats(request: web.Request) -> web.Response:
+        return web.json_response(service.stats())
+
+    async def on_cleanup(app: web.Application):
+        await service.close()
+
+    app = web.Application()
+    app.router.add_get("/daily", daily)
+    app.router.add_post("/batch", batch)
+    app.router.add_get("/stats", stats)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="NameGlow daily content service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes for content generation (default: threads in this process)")
+    parser.add_argument("--cache-size", type=int, default=100_000, help="cached (name, date) responses")
+    parser.add_argument("--seed", default=None, help="run seed mixed into each user's choices")
+    parser.add_argument("--time-budget-ms", type=float, default=None, help="per-user anagram search limit")
+    parser.add_argument("--word-index", default=None, help="index from build_word_index for real-word anagrams")
+    parser.add_argument("--pronounceable", action="store_true", help="rank jumbles by pronounceability")
+    parser.add_argument("--metrics", action="store_true", help="record stage timings, shown under /stats")
+    args = parser.parse_args()
+
+    nameglow = NameGlow(word_index_path=args.word_index, pronounceable=args.pronounceable,
+                        metrics=MetricsRegistry() if args.metrics else None)
+    service = DailyContentService(nameglow, workers=args.workers, cache_size=args.cache_size,
+                                  seed=args.seed, time_budget_ms=args.time_budget_ms)
+    web.run_app(make_app(service), host=args.host, port=args.port)
@@ -0,0 +1,243 @@
+"""Memory-mapped signature index for real-word anagrams (needs numpy)"""
+import itertools
+import mmap
+import os
+import struct
+from typing import List, Dict, Optional, Sequence
+
+from .anagrams import SearchBudget
+
+# Binary layout (little-endian), entries sorted by length desc then signature:
+#   header        : magic b"NGWI", version u32, entry count u32, reserved u32
+#   letter counts : count x 26 u8, padded to a 4-byte boundary
+#   sig offsets   : (count + 1) u32 into the signature blob
+#   word offsets  : (count + 1) u32 into the word blob
+#   signature blob: concatenated sorted-letter signatures
+#   word blob     : per entry, its words joined by "\n"
+DEFAULT_WORDLIST = "/usr/share/dict/words"
+DEFAULT_WORD_INDEX = "nameglow_words.idx"
+WORD_INDEX_MAGIC = b"NGWI"
+WORD_INDEX_VERSION = 1
+_HEADER = struct.Struct("<4sIII")
+_ALPHABET = 'abcdefghijklmnopqrstuvwxyz'
+
+
+def _letter_counts(letters: str) -> List[int]:
+    counts = [0] * 26
+    for letter in letters:
+        counts[ord(letter) - 97] += 1
+    return counts
+
+
+def build_word_index(wordlist_path: str = DEFAULT_WORDLIST,
+                     index_path: str = DEFAULT_WORD_INDEX,
+                     min_length: int = 2) -> int:
+    """
+    Build the binary signature index used by dictionary anagram mode
+    
+    Parameters:
+    -----------
+    wordlist_path : str
+        Plain text word list, one word per line
+    index_path : str
+        Where to write the index file
+    min_length : int
+        Shortest word to keep
+        
+    Returns:
+    --------
+    int
+        Number of distinct signatures written
+    """
+    groups: Dict[str, List[str]] = {}
+    with open(wordlist_path, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            word = line.strip().lower()
+            if len(word) < min_length or not all('a' <= c <= 'z' for c in word):
+                continue
+            words = groups.setdefault(''.join(sorted(word)), [])
+            if word not in words:
+                words.append(word)
+    
+    signatures = sorted(groups, key=lambda sig: (-len(sig), sig))
+    count = len(signatures)
+    
+    counts = bytearray()
+    sig_offsets = [0]
+    word_offsets = [0]
+    sig_blob = bytearray()
+    word_blob = bytearray()
+    for sig in signatures:
+        counts.extend(_letter_counts(sig))
+        sig_blob.extend(sig.encode('ascii'))
+        sig_offsets.append(len(sig_blob))
+        word_blob.extend('\n'.join(groups[sig]).encode('ascii'))
+        word_offsets.append(len(word_blob))
+    counts.extend(b'\0' * (-len(counts) % 4))
+    
+    # Write to a temp file and swap it in so readers never see a partial index
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(WORD_INDEX_MAGIC, WORD_INDEX_VERSION, count, 0))
+        f.write(counts)
+        f.write(struct.pack(f"<{count + 1}I", *sig_offsets))
+        f.write(struct.pack(f"<{count + 1}I", *word_offsets))
+        f.write(sig_blob)
+        f.write(word_blob)
+    os.replace(tmp_path, index_path)
+    return count
+
+
+class WordIndex:
+    """
+    Read-only, memory-mapped view of a signature index built by build_word_index
+    
+    The file is mapped rather than read, so opening it is O(1) and worker
+    processes using the same index share one copy of its pages.
+    """
+    
+    def __init__(self, path: str = DEFAULT_WORD_INDEX):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        magic, version, count, _ = _HEADER.unpack_from(self._mm, 0)
+        if magic != WORD_INDEX_MAGIC or version != WORD_INDEX_VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} is not a NameGlow word index (version {WORD_INDEX_VERSION})")
+        self.count = count
+        
+        import numpy as np
+        pos = _HEADER.size
+        self._counts = np.frombuffer(self._mm, dtype=np.uint8, count=count * 26, offset=pos).reshape(count, 26)
+        pos += count * 26 + (-(count * 26) % 4)
+        view = memoryview(self._mm)
+        self._sig_offsets = view[pos:pos + 4 * (count + 1)].cast('I')
+        pos += 4 * (count + 1)
+        self._word_offsets = view[pos:pos + 4 * (count + 1)].cast('I')
+        pos += 4 * (count + 1)
+        self._sig_base = pos
+        self._word_base = pos + self._sig_offsets[count]
+    
+    def _signature(self, entry: int) -> bytes:
+        start = self._sig_base
+        return self._mm[start + self._sig_offsets[entry]:start + self._sig_offsets[entry + 1]]
+    
+    def _words(self, entry: int) -> List[str]:
+        start = self._word_base
+        raw = self._mm[start + self._word_offsets[entry]:start + self._word_offsets[entry + 1]]
+        return raw.decode('ascii').split('\n')
+    
+    def _find(self, signature: str) -> int:
+        """Binary search for a signature, returning its entry number or -1"""
+        key = (-len(signature), signature.encode('ascii'))
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            sig = self._signature(mid)
+            if (-len(sig), sig) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self._signature(lo) == key[1]:
+            return lo
+        return -1
+    
+    def lookup(self, letters: str) -> List[str]:
+        """Return the dictionary words that are exact anagrams of ``letters``"""
+        entry = self._find(''.join(sorted(letters)))
+        return self._words(entry) if entry >= 0 else []
+    
+    def phrases(self, letters: str, max_results: int = 5, max_words: int = 3,
+                exclude: Sequence[str] = (), budget: Optional[SearchBudget] = None) -> List[str]:
+        """
+        Find words and multi-word phrases that use exactly ``letters``
+        
+        Parameters:
+        -----------
+        letters : str
+            Lowercase letters to rearrange
+        max_results : int
+            Maximum number of phrases to return
+        max_words : int
+            Maximum number of words per phrase
+        exclude : Sequence[str]
+            Phrases to skip (compared with spaces removed)
+        budget : SearchBudget
+            Optional work limit, ticked once per search node
+        
+        Returns:
+        --------
+        List[str]
+            Phrases, longest leading word first
+        """
+        import numpy as np
+        letters = ''.join(c for c in letters.lower() if 'a' <= c <= 'z')
+        if not letters or max_results <= 0:
+            return []
+        target = np.array(_letter_counts(letters), dtype=np.uint8)
+        excluded = {e.replace(" ", "") for e in exclude}
+        results: List[str] = []
+        
+        # Only entries whose letter counts fit inside the name can take part
+        candidates = np.flatnonzero((self._counts <= target).all(axis=1))
+        cand_counts = self._counts[candidates]
+        cand_lengths = cand_counts.sum(axis=1, dtype=np.int32)
+        seen = set()
+        
+        def emit(chosen: List[int]) -> bool:
+            key = tuple(sorted(chosen))
+            if key in seen:
+                return False
+            seen.add(key)
+            for combo in itertools.product(*(self._words(e) for e in key)):
+                phrase = ' '.join(combo)
+                if phrase.replace(" ", "") not in excluded:
+                    results.append(phrase)
+                    if len(results) >= max_results:
+                        return True
+            return False
+        
+        def search(fit: np.ndarray, remaining: np.ndarray, chosen: List[int]) -> bool:
+            if budget is not None and not budget.tick():
+                return True
+            slots = max_words - len(chosen)
+            if slots == 1:
+                # The last word must use up every remaining letter exactly
+                entry = self._find(''.join(_ALPHABET[i] * int(n) for i, n in enumerate(remaining)))
+                return entry >= 0 and emit(chosen + [entry])
+            
+            fit = fit[(cand_counts[fit] <= remaining).all(axis=1)]
+            if len(fit) == 0:
+                return False
+            
+            # Every phrase has to cover the remaining letter with the fewest
+            # fitting words, so branch only on words containing that letter
+            needed = np.flatnonzero(remaining)
+            covering = (cand_counts[fit][:, needed] > 0).sum(axis=0)
+            if covering.min() == 0:
+                return False
+            letter = needed[covering.argmin()]
+            
+            # The other slots can absorb at most (slots - 1) of the longest words
+            min_length = int(remaining.sum()) - (slots - 1) * int(cand_lengths[fit[0]])
+            for i in fit[cand_counts[fit, letter] > 0]:
+                if cand_lengths[i] < min_length:
+                    break
+                rest = remaining - cand_counts[i]
+                chosen.append(int(candidates[i]))
+                done = emit(chosen) if not rest.any() else search(fit, rest, chosen)
+                chosen.pop()
+                if done:
+                    return True
+            return False
+        
+        search(np.arange(len(candidates)), target, [])
+        return results
+    
+    def close(self):
+        """Release the memory map"""
+        self._sig_offsets.release()
+        self._word_offsets.release()
+        self._counts = None
+        self._mm.close()